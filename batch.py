@@ -0,0 +1,154 @@
+"""
+Batch runner that plays many games, spread across a pool of processes.
+
+As a script it plays random games (or the games of block files) and prints one
+JSON line per game as soon as it finishes, for instance:
+    python batch.py --boards 10x10 20x15 --methods simple expert --games 100
+    python batch.py --boards 10x10 --files blocks1.txt blocks2.txt --serial
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+from gameboard import *
+from myplayer import MyPlayer, play_game
+from blocks import random_blocks, open_blocks
+
+# A game to be played
+#   id -> identifier of the job, returned with its result
+#   width, height -> shape of the board
+#   method -> level of the player
+#   blocks -> list of shapes or name of a local file of blocks, text or binary; if None, n_blocks random shapes generated from seed
+#   seed -> seed of the random blocks
+#   n_blocks -> number of random blocks
+#   options -> dictionary with other arguments for MyPlayer
+Job = collections.namedtuple('Job', 'id width height method blocks seed n_blocks options', defaults=(None, 0, 100, None))
+
+# The result of a game
+#   placed -> number of blocks placed
+#   seconds -> time spent playing
+#   fill -> fraction of the squares of the board full at the end
+GameResult = collections.namedtuple('GameResult', 'id width height method placed seconds fill')
+
+
+def run_job(job):
+    """
+    Function that plays the game of a job and returns its GameResult
+    """
+
+    if job.blocks is None:
+        blocks = random_blocks(Shape(job.width, job.height), job.n_blocks, job.seed)
+    elif isinstance(job.blocks, str):
+        blocks = open_blocks(job.blocks)
+    else:
+        blocks = job.blocks
+
+    player = MyPlayer(job.width, job.height, job.method, **(job.options or {}))
+    start = time.perf_counter()
+    placed = play_game(player, blocks, show=False)
+    seconds = time.perf_counter() - start
+
+    fill = sum(player._board.row_counters())/(job.width*job.height)
+    return GameResult(job.id, job.width, job.height, job.method, placed, seconds, fill)
+
+
+def _run_chunk(chunk):
+    """
+    Auxiliar function that plays a list of jobs in a worker process
+    """
+
+    return [run_job(job) for job in chunk]
+
+
+def run_batch(jobs, workers = None, chunksize = None, serial = False):
+    """
+    Generator of the GameResults of a list of jobs, in the order they finish
+    Arguments:
+        jobs -> iterable of Jobs
+        workers -> number of processes, the number of cores if not given
+        chunksize -> number of jobs sent together to a process; if not given, about four chunks per process
+        serial -> if asserted, the jobs are played one after the other in this process, to debug them
+    """
+
+    if serial:
+        for job in jobs:
+            yield run_job(job)
+        return
+
+    jobs = list(jobs)
+    if not jobs:
+        return
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(jobs)//(4*workers))
+
+    # small games are sent in chunks, so that they are not dominated by the communication between processes
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+        for future in concurrent.futures.as_completed(futures):
+            for result in future.result():
+                yield result
+
+
+def make_jobs(boards, methods, games = 1, n_blocks = 100, seed = 0, files = None, options = None):
+    """
+    Function that returns the jobs of all combinations of boards, methods and games
+    Each game has its own seed, seed + number of the game, so the same arguments give the same games
+    Arguments:
+        boards -> list of shapes of the boards
+        methods -> list of levels of the players
+        games -> number of random games of each board and method, 1 if not given
+        n_blocks -> number of blocks of each random game, 100 if not given
+        seed -> first seed, 0 if not given
+        files -> list of local files of blocks; if given, they are played instead of random games
+        options -> dictionary with other arguments for MyPlayer
+    """
+
+    jobs = []
+    for board in boards:
+        for method in methods:
+            if files:
+                for name in files:
+                    jobs.append(Job(len(jobs), board.width, board.height, method, name, options=options))
+            else:
+                for game in range(games):
+                    jobs.append(Job(len(jobs), board.width, board.height, method, None, seed + game, n_blocks, options))
+    return jobs
+
+
+def _board_shape(text):
+    """
+    Auxiliar function to read a board shape written as WIDTHxHEIGHT
+    """
+
+    width, _, height = text.partition('x')
+    return Shape(int(width), int(height))
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Plays many games in parallel")
+    parser.add_argument("--boards", type=_board_shape, nargs="+", default=[Shape(10, 10)], help="shapes of the boards, as WIDTHxHEIGHT")
+    parser.add_argument("--methods", nargs="+", default=["simple", "expert"], help="levels of the players")
+    parser.add_argument("--games", type=int, default=10, help="random games of each board and method")
+    parser.add_argument("--blocks", type=int, default=100, help="blocks of each random game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first random game")
+    parser.add_argument("--files", nargs="+", help="local files of blocks, text or binary, to play instead of random games")
+    parser.add_argument("--workers", type=int, help="number of processes, the number of cores by default")
+    parser.add_argument("--chunksize", type=int, help="games sent together to a process")
+    parser.add_argument("--serial", action="store_true", help="play the games in this process, one after the other")
+    args = parser.parse_args(argv)
+
+    jobs = make_jobs(args.boards, args.methods, args.games, args.blocks, args.seed, args.files)
+    for result in run_batch(jobs, args.workers, args.chunksize, args.serial):
+        print(json.dumps(result._asdict()), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Benchmarks of the board operations and of the players.
+
+Run it as a script to measure and save the results as JSON:
+    python benchmark.py --output results.json
+and to compare against a stored baseline, failing if something got slower:
+    python benchmark.py --baseline results.json --threshold 0.2
+The games measured with --profile are played again after the others, so the time spent
+measuring them doesn't get into the results. The same benchmarks can be run with
+pytest-benchmark from tests/test_benchmark.py.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from gameboard import *
+from bitboard import BitGameBoard
+from compactboard import CompactGameBoard
+from myplayer import MyPlayer
+from blocks import random_blocks
+
+DEFAULT_SIZES = [5, 20, 50, 100, 200]
+DEFAULT_METHODS = ["simple", "expert"]
+
+# boards whose operations are measured, as name -> (class, options)
+# The results of "list" keep the names they had before the others were measured.
+BOARDS = {
+    "list": (GameBoard, {}),
+    "bit": (BitGameBoard, {}),
+    "compact": (CompactGameBoard, {}),
+    "list+index": (GameBoard, {"index": True}),
+    "bit+index": (BitGameBoard, {"index": True}),
+    "compact+index": (CompactGameBoard, {"index": True}),
+    "list+free_space": (GameBoard, {"free_space": True}),
+    "bit+free_space": (BitGameBoard, {"free_space": True}),
+    "compact+free_space": (CompactGameBoard, {"free_space": True}),
+}
+
+
+def summarize(latencies):
+    """
+    Function that returns the statistics of a list of latencies, given in seconds
+    The latencies of the result are in microseconds
+    """
+
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p*len(ordered)))]*1e6
+
+    return {
+        "count": len(ordered),
+        "mean_us": sum(ordered)/len(ordered)*1e6,
+        "p50_us": percentile(0.50),
+        "p90_us": percentile(0.90),
+        "p99_us": percentile(0.99),
+        "max_us": ordered[-1]*1e6,
+    }
+
+
+def bench_operations(size, repeat = 1000, seed = 0, board_class = GameBoard, **options):
+    """
+    Function that measures the operations of a size*size board
+    Returns a dictionary with the statistics of each operation
+    Arguments:
+        size -> width and height of the board
+        repeat -> number of times each operation is measured, 1000 if not given
+        seed -> seed of the random rectangles, 0 if not given
+        board_class -> class of the board, GameBoard if not given
+        options -> other arguments for the board, like index or free_space
+    """
+
+    rng = random.Random(seed)
+    clock = time.perf_counter
+    board = board_class(Shape(size, size), **options)
+    latencies = {"put": [], "remove": [], "is_empty": [], "clear_rows": [], "clear_columns": [], "place_and_clear": []}
+
+    def random_rectangle():
+        shape = Shape(rng.randint(1, min(4, size)), rng.randint(1, min(4, size)))
+        return Location(rng.randint(0, size - shape.height), rng.randint(0, size - shape.width)), shape
+
+    # half fill the board with squares so that the checks have something to find
+    for _ in range(size*size//2):
+        location = Location(rng.randrange(size), rng.randrange(size))
+        if board.is_empty(location):
+            board.put(location)
+
+    for _ in range(repeat):
+        location, shape = random_rectangle()
+        start = clock()
+        empty = board.is_empty(location, shape)
+        latencies["is_empty"].append(clock() - start)
+
+        # put and remove leave the board as it was
+        if empty:
+            start = clock()
+            board.put(location, shape)
+            latencies["put"].append(clock() - start)
+            start = clock()
+            board.remove(location, shape)
+            latencies["remove"].append(clock() - start)
+
+            # undone with the journal, because it may clear lines
+            mark = board.checkpoint()
+            start = clock()
+            board.place_and_clear(location, shape)
+            latencies["place_and_clear"].append(clock() - start)
+            board.rollback(mark)
+            board.commit(mark)
+
+    # clear a full row and a full column each time, refilling their empty squares first
+    for _ in range(max(1, repeat//10)):
+        row = rng.randrange(size)
+        for j in range(size):
+            if board.is_empty(Location(row, j)):
+                board.put(Location(row, j))
+        start = clock()
+        board.clear_rows([row])
+        latencies["clear_rows"].append(clock() - start)
+
+        column = rng.randrange(size)
+        for i in range(size):
+            if board.is_empty(Location(i, column)):
+                board.put(Location(i, column))
+        start = clock()
+        board.clear_columns([column])
+        latencies["clear_columns"].append(clock() - start)
+
+    return {name: summarize(values) for name, values in latencies.items()}
+
+
+def bench_game(size, method, n_blocks = 100, seed = 0, profiler = None, **options):
+    """
+    Function that measures a game of a player in a size*size board
+    Returns the statistics of the latency of each move, with the blocks placed and the blocks per second
+    Arguments:
+        size -> width and height of the board
+        method -> level of the player
+        n_blocks -> number of random blocks of the game, 100 if not given
+        seed -> seed of the random blocks, 0 if not given
+        profiler -> Profiler that measures the player, optional argument
+        options -> other arguments for MyPlayer
+    """
+
+    clock = time.perf_counter
+    player = MyPlayer(size, size, method, **options)
+    if profiler is not None:
+        profiler.instrument_player(player)
+    latencies = []
+    placed = 0
+
+    # the same loop than play_game, timing each move
+    for block in random_blocks(Shape(size, size), n_blocks, seed):
+        start = clock()
+        location = player.play(block)
+        if location is not None:
+            player.place_block(location, block)
+        latencies.append(clock() - start)
+        if location is None:
+            break
+        placed += 1
+
+    result = summarize(latencies)
+    result["blocks_placed"] = placed
+    result["blocks_per_second"] = len(latencies)/sum(latencies) if latencies else 0.0
+    return result
+
+
+def run(sizes = DEFAULT_SIZES, methods = DEFAULT_METHODS, n_blocks = 100, repeat = 1000, seed = 0, boards = BOARDS):
+    """
+    Function that runs all the benchmarks and returns the results, ready to be saved as JSON
+    The operations of the board "list" are named ops/<operation>/<size>, and the ones of the
+    other boards ops/<operation>/<size>/<board>.
+    Arguments:
+        boards -> names of the boards of BOARDS whose operations are measured, all if not given
+    """
+
+    results = {}
+    for size in sizes:
+        for board in boards:
+            board_class, options = BOARDS[board]
+            suffix = "" if board == "list" else "/" + board
+            for operation, stats in bench_operations(size, repeat, seed, board_class, **options).items():
+                results["ops/" + operation + "/" + str(size) + "x" + str(size) + suffix] = stats
+        for method in methods:
+            results["game/" + method + "/" + str(size) + "x" + str(size)] = bench_game(size, method, n_blocks, seed)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "sizes": list(sizes),
+            "methods": list(methods),
+            "boards": list(boards),
+            "n_blocks": n_blocks,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def profile_games(profiler, sizes = DEFAULT_SIZES, methods = DEFAULT_METHODS, n_blocks = 100, seed = 0):
+    """
+    Function that plays the games of the benchmarks again, measured by a Profiler
+    They are played apart from run because the profiler makes them slower.
+    """
+
+    for size in sizes:
+        for method in methods:
+            bench_game(size, method, n_blocks, seed, profiler)
+
+
+def compare(current, baseline, threshold = 0.1, statistic = "p50_us"):
+    """
+    Function that compares two runs of the benchmarks
+    Returns a list of (name, baseline value, current value) of the benchmarks whose statistic
+    has grown more than the threshold, as a fraction of the baseline
+    """
+
+    regressions = []
+    for name, stats in current["results"].items():
+        old = baseline["results"].get(name, {}).get(statistic)
+        new = stats.get(statistic)
+        if old is None or new is None:
+            continue
+        if new > old*(1 + threshold):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the boards and the players")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="sides of the square boards")
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS, help="levels of the players")
+    parser.add_argument("--boards", nargs="+", default=list(BOARDS), choices=list(BOARDS), help="boards whose operations are measured")
+    parser.add_argument("--blocks", type=int, default=100, help="blocks of each game")
+    parser.add_argument("--repeat", type=int, default=1000, help="repetitions of each operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file where the results are saved as JSON")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown against the baseline, 0.1 is 10%%")
+    parser.add_argument("--profile", help="file where a Chrome trace of the games, played again, is saved with their measures besides it")
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.methods, args.blocks, args.repeat, args.seed, args.boards)
+
+    for name, stats in current["results"].items():
+        line = name.ljust(46) + " p50 {:10.1f} us  p99 {:10.1f} us".format(stats.get("p50_us", 0), stats.get("p99_us", 0))
+        if "blocks_per_second" in stats:
+            line += "  {:8.1f} blocks/s  {} placed".format(stats["blocks_per_second"], stats["blocks_placed"])
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as writer:
+            json.dump(current, writer, indent=2)
+
+    if args.profile:
+        # the profiler is only imported when it is used
+        from profiler import Profiler
+        profiler = Profiler(trace=True)
+        profile_games(profiler, args.sizes, args.methods, args.blocks, args.seed)
+        profiler.write_chrome_trace(args.profile)
+        with open(args.profile + ".stats.json", "w") as writer:
+            writer.write(profiler.to_json())
+
+    if args.baseline:
+        with open(args.baseline) as reader:
+            baseline = json.load(reader)
+        regressions = compare(current, baseline, args.threshold)
+        for name, old, new in regressions:
+            print("REGRESSION", name, "{:.1f} us -> {:.1f} us".format(old, new))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+from gameboard import *
+
+class BitGameBoard(GameBoard):
+    """
+    Class to create and manipulate the boards of the game, storing each row as an integer bitmask.
+    It has the same methods than GameBoard, but checking a rectangle costs one operation per row.
+    """
+
+    __slots__ = ('_rows', '_columns')
+
+    def row_bits(self, row):
+        return self._rows[row]
+
+
+    def _create_board(self):
+        # bit j of _rows[i] is the square (i, j), and bit i of _columns[j] is the same square
+        # All bits begin at 0, they are all empty
+        self._rows = [0]*self.get_shape().height
+        self._columns = [0]*self.get_shape().width
+
+    def _save_board(self):
+        return (list(self._rows), list(self._columns))
+
+    def _load_board(self, saved):
+        self._rows = list(saved[0])
+        self._columns = list(saved[1])
+
+    def _cell(self, row, column):
+        return self._rows[row] >> column & 1 == 1
+
+    def _rect_count(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        count = 0
+        for i in range(row, row + height):
+            count += (self._rows[i] & mask).bit_count()
+        return count
+
+    def _rect_is_empty(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        for i in range(row, row + height):
+            if self._rows[i] & mask:
+                return False
+        return True
+
+    def _rect_is_full(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        for i in range(row, row + height):
+            if self._rows[i] & mask != mask:
+                return False
+        return True
+
+    def _fill_rect(self, row, column, width, height):
+        row_mask = ((1 << width) - 1) << column
+        column_mask = ((1 << height) - 1) << row
+        for i in range(row, row + height):
+            self._rows[i] |= row_mask
+        for j in range(column, column + width):
+            self._columns[j] |= column_mask
+
+    def _empty_rect(self, row, column, width, height):
+        row_mask = ~(((1 << width) - 1) << column)
+        column_mask = ~(((1 << height) - 1) << row)
+        for i in range(row, row + height):
+            self._rows[i] &= row_mask
+        for j in range(column, column + width):
+            self._columns[j] &= column_mask
+
+    def _wipe_row(self, row):
+        wiped = list(_bits(self._rows[row]))
+        self._rows[row] = 0
+        mask = ~(1 << row)
+        for j in wiped:
+            self._columns[j] &= mask
+        return wiped
+
+    def _wipe_column(self, column):
+        wiped = list(_bits(self._columns[column]))
+        self._columns[column] = 0
+        mask = ~(1 << column)
+        for i in wiped:
+            self._rows[i] &= mask
+        return wiped
+
+
+def _bits(bits):
+    """
+    Generator of the positions of the bits set to 1 of an integer, from the lowest
+    """
+
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
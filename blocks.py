@@ -0,0 +1,284 @@
+"""
+Sources of blocks to be played.
+"""
+
+import array
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+
+from gameboard import *
+
+
+def random_blocks(boardShape, n, seed = 0, max_size = 4):
+    """
+    Function that returns a list of n random shapes that fit in a board, always the same for the same seed
+    Arguments:
+        boardShape -> shape of the board
+        n -> number of shapes
+        seed -> seed of the random generator, 0 if not given
+        max_size -> maximum width and height of the shapes, 4 if not given
+    """
+
+    rng = random.Random(seed)
+    max_width = min(max_size, boardShape.width)
+    max_height = min(max_size, boardShape.height)
+    return [Shape(rng.randint(1, max_width), rng.randint(1, max_height)) for _ in range(n)]
+
+
+def iter_blocks(source, url = False, chunk_size = 1 << 16, use_mmap = False):
+    """
+    Generator of the shapes of a file of integers, with the same format and checks than read_file.
+    Each pair of consecutive integers represents a shape (width and height). The file is read in
+    chunks while the shapes are asked for, so it is never entirely in memory, and it stops being
+    read when the generator is not used anymore.
+    Arguments:
+        source -> name of a local file, "-" for the standard input, an url if url is asserted, or an open file
+        url -> if asserted, source is an url, False if not given
+        chunk_size -> number of bytes read each time, 65536 if not given
+        use_mmap -> if asserted, a local file is mapped in memory and scanned without copying it, False if not given
+    """
+
+    if not isinstance(source, str):
+        # an open file, binary or text; the name of a file opened from a descriptor is an integer
+        name = getattr(source, 'name', None)
+        yield from _shapes(_tokens(source, chunk_size), name if isinstance(name, str) else 'the stream')
+    elif source == "-":
+        yield from _shapes(_tokens(sys.stdin.buffer, chunk_size), "the standard input")
+    elif url:
+        import urllib.request
+        with urllib.request.urlopen(source) as reader:
+            yield from _shapes(_tokens(reader, chunk_size), source)
+    elif use_mmap:
+        with open(source, "rb") as reader:
+            if os.fstat(reader.fileno()).st_size == 0:
+                # empty files can not be mapped
+                return
+            with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                tokens = (match.group() for match in re.finditer(rb'\S+', mapped))
+                try:
+                    yield from _shapes(tokens, source)
+                finally:
+                    # the search has to let go of the map before it is closed, even after an error
+                    tokens.close()
+    else:
+        with open(source, "rb") as reader:
+            yield from _shapes(_tokens(reader, chunk_size), source)
+
+
+def _tokens(reader, chunk_size):
+    """
+    Auxiliar generator of the words of a file, read in chunks
+    """
+
+    rest = b''
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        chunk = rest + chunk
+        items = chunk.split()
+        # the last word may continue in the next chunk
+        if items and not chunk[-1:].isspace():
+            rest = items.pop()
+        else:
+            rest = b''
+        yield from items
+    if rest:
+        yield rest
+
+
+def _shapes(tokens, name):
+    """
+    Auxiliar generator of the shapes of pairs of words, checking them like read_file
+    """
+
+    width = None
+    for item in tokens:
+        # Check the items are numbers
+        assert item.isdigit(), "Some element in the list is not an integer"
+        if width is None:
+            width = int(item)
+            continue
+        w, h = width, int(item)
+        width = None
+        assert w > 0 and h > 0, "Illegal size for a shape"
+        yield Shape(w, h)
+
+    # Check there is an even number of items
+    assert width is None, "Wrong number of items in " + name
+
+
+# Binary format of blocks: a header and then the width and height of each shape,
+# as little endian unsigned 16 bits integers
+#   magic -> BINARY_MAGIC
+#   version -> BINARY_VERSION, 16 bits
+#   reserved -> 16 bits, 0
+#   count -> number of shapes, 64 bits
+BINARY_MAGIC = b'HTBK'
+BINARY_VERSION = 1
+_HEADER = struct.Struct('<4sHHQ')
+
+
+def write_binary(shapes, name):
+    """
+    Function that writes shapes to a file in the binary format and returns how many it has written
+    Arguments:
+        shapes -> iterable of shapes, their widths and heights must be smaller than 65536
+        name -> name of the file
+    """
+
+    count = 0
+    with open(name, "wb") as writer:
+        # the number of shapes is written at the end, when it is known
+        writer.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, 0))
+        buffer = array.array('H')
+        for shape in shapes:
+            assert 0 < shape.width < 65536 and 0 < shape.height < 65536, "Illegal size for a shape"
+            buffer.append(shape.width)
+            buffer.append(shape.height)
+            count += 1
+            if len(buffer) >= 1 << 16:
+                _write_little_endian(writer, buffer)
+                buffer = array.array('H')
+        _write_little_endian(writer, buffer)
+        writer.seek(0)
+        writer.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, count))
+    return count
+
+
+def _write_little_endian(writer, buffer):
+    """
+    Auxiliar function that writes an array of integers in little endian
+    """
+
+    if sys.byteorder != 'little':
+        buffer.byteswap()
+    writer.write(buffer.tobytes())
+
+
+def convert_text(source, destination, **options):
+    """
+    Function that converts a file of blocks in the text format of read_file to the binary format
+    Returns the number of shapes converted
+    Arguments:
+        source -> the text file, as in iter_blocks
+        destination -> name of the binary file
+        options -> other arguments for iter_blocks
+    """
+
+    return write_binary(iter_blocks(source, **options), destination)
+
+
+def is_binary(name):
+    """
+    Function that returns if a local file is in the binary format of blocks
+    """
+
+    with open(name, "rb") as reader:
+        return reader.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def open_blocks(name, **options):
+    """
+    Function that returns the shapes of a local file in any format: a ShapeView if it is binary,
+    and a generator from iter_blocks if it is text
+    Arguments:
+        name -> name of the file
+        options -> other arguments for iter_blocks
+    """
+
+    if is_binary(name):
+        return load_binary(name)
+    return iter_blocks(name, **options)
+
+
+def load_binary(name):
+    """
+    Function that maps a binary file of blocks in memory and returns a ShapeView of it, without reading it
+    """
+
+    with open(name, "rb") as reader:
+        header = reader.read(_HEADER.size)
+        assert len(header) == _HEADER.size, "The file " + name + " is not a binary file of blocks"
+        magic, version, _, count = _HEADER.unpack(header)
+        assert magic == BINARY_MAGIC, "The file " + name + " is not a binary file of blocks"
+        assert version == BINARY_VERSION, "Unknown version of the binary format in " + name
+        assert os.fstat(reader.fileno()).st_size == _HEADER.size + 4*count, "Wrong number of items in " + name
+        mapped = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+    return ShapeView(mapped, count)
+
+
+class ShapeView:
+    """
+    Class of a read-only sequence of the shapes of a binary file of blocks.
+    The shapes are not created until they are asked for, and the integers are read
+    from the file mapped in memory without copying it.
+    """
+
+    def __init__(self, mapped, count):
+        """
+        Initialization of the view of a binary file of blocks mapped in memory.
+        Arguments:
+            mapped -> the file mapped in memory, with its header
+            count -> number of shapes
+        """
+
+        self._mapped = mapped
+        self._count = count
+        if sys.byteorder == 'little':
+            self._items = memoryview(mapped)[_HEADER.size:].cast('H')
+        else:
+            # the integers have to be swapped, so they are copied
+            self._items = array.array('H', mapped[_HEADER.size:])
+            self._items.byteswap()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("shape index out of range")
+        w, h = self._items[2*i], self._items[2*i + 1]
+        assert w > 0 and h > 0, "Illegal size for a shape"
+        return Shape(w, h)
+
+    def __iter__(self):
+        items = self._items
+        for i in range(0, 2*self._count, 2):
+            w, h = items[i], items[i + 1]
+            assert w > 0 and h > 0, "Illegal size for a shape"
+            yield Shape(w, h)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def pairs(self):
+        """
+        Method that returns the widths and heights as a count*2 NumPy array that shares the memory of the file
+        NumPy must be installed
+        """
+
+        import numpy
+        return numpy.frombuffer(self._mapped, dtype='<u2', count=2*self._count, offset=_HEADER.size).reshape(self._count, 2)
+
+    def close(self):
+        """
+        Method to unmap the file, the view can not be used afterwards
+        """
+
+        if isinstance(self._items, memoryview):
+            self._items.release()
+        self._mapped.close()
@@ -0,0 +1,174 @@
+"""
+Command line of the game, for instance:
+    python -m cli play blocks.txt --board 10x10 --method expert
+    python -m cli benchmark --sizes 20 50
+    python -m cli replay game.htgm --move 1000
+    python -m cli importtime --budget 100
+
+Each command only imports the modules it needs, so a short command starts fast. The other
+commands (serve, load, batch, tune, memory) run the main function of their modules with the
+rest of the arguments.
+"""
+
+import argparse
+import sys
+
+# commands that run the main function of a module
+MODULES = {
+    "benchmark": "benchmark",
+    "replay": "recorder",
+    "serve": "server",
+    "load": "client",
+    "batch": "batch",
+    "tune": "tuning",
+    "memory": "memory",
+}
+
+# modules that must not be imported just to start, they take long
+HEAVY_MODULES = ["urllib.request", "numpy", "asyncio", "concurrent.futures"]
+
+
+def play(args):
+    """
+    Function of the play command: plays the blocks of a file and prints how many could be placed
+    """
+
+    from gameboard import Shape
+    from myplayer import MyPlayer, play_game
+    from blocks import open_blocks, iter_blocks
+
+    w, _, h = args.board.partition('x')
+    player = MyPlayer(int(w), int(h), args.method, backend=args.backend, prune=args.prune, free_space=args.free_space)
+    blocks = iter_blocks(args.file, url=True) if args.url else open_blocks(args.file)
+
+    show = args.show
+    if args.every is not None or args.interval is not None or args.diff:
+        from render import Display
+        show = Display(args.every, args.interval, args.diff)
+
+    profiler = None
+    if args.profile:
+        from profiler import Profiler
+        profiler = Profiler(trace=True)
+        profiler.instrument_player(player)
+
+    recorder = None
+    if args.record:
+        from recorder import GameRecorder
+        recorder = GameRecorder(args.record, Shape(int(w), int(h)))
+    try:
+        placed = play_game(player, blocks, show, recorder)
+    finally:
+        if recorder is not None:
+            recorder.close()
+
+    if profiler is not None:
+        profiler.write_chrome_trace(args.profile)
+    print(placed, "blocks placed")
+    return 0
+
+
+def import_time(module, runs = 3):
+    """
+    Function that measures the import of a module in a new interpreter
+    Returns the microseconds of the fastest of some imports and the names of all the modules imported,
+    the microseconds are None if the interpreter had already imported the module when it started, like os
+    Arguments:
+        module -> name of the module
+        runs -> number of imports measured, 3 if not given
+    """
+
+    import os
+    import subprocess
+
+    # the modules of the game are found from the folder of this file
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                                capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        imported = []
+        total = None
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or line.endswith("imported package"):
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imported.append(name.strip())
+            if name.rstrip() == " " + module:
+                total = int(cumulative)
+        if total is not None and (best is None or total < best):
+            best = total
+    return best, imported
+
+
+def check_imports(args):
+    """
+    Function of the importtime command: fails if a module takes longer than the budget to be imported,
+    or imports one of the heavy modules
+    """
+
+    import subprocess
+
+    failed = False
+    for module in args.modules:
+        try:
+            micros, imported = import_time(module)
+        except subprocess.CalledProcessError:
+            print("{:12} can not be imported".format(module))
+            failed = True
+            continue
+        heavy = [name for name in args.forbid if name in imported]
+        if micros is None:
+            # it costs nothing, the interpreter always imports it
+            line = "{:12} imported when the interpreter starts".format(module)
+        else:
+            line = "{:12} {:8.1f} ms".format(module, micros/1000)
+        if micros is not None and micros > args.budget*1000:
+            line += "  over the budget of {} ms".format(args.budget)
+            failed = True
+        if heavy:
+            line += "  imports " + ", ".join(heavy)
+            failed = True
+        print(line)
+    return 1 if failed else 0
+
+
+def main(argv = None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # the commands of other modules are given all their arguments without parsing them
+    if argv and argv[0] in MODULES:
+        import importlib
+        return importlib.import_module(MODULES[argv[0]]).main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Command line of the game",
+                                     epilog="other commands: " + ", ".join(MODULES))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_play = commands.add_parser("play", help="play the blocks of a file")
+    parser_play.add_argument("file", help="file of blocks, in text or binary format, or an url with --url")
+    parser_play.add_argument("--url", action="store_true", help="the file is an url")
+    parser_play.add_argument("--board", default="10x10", help="shape of the board, as WIDTHxHEIGHT")
+    parser_play.add_argument("--method", default="simple")
+    parser_play.add_argument("--backend", default="list")
+    parser_play.add_argument("--prune", action="store_true", help="the expert player prunes the locations")
+    parser_play.add_argument("--free-space", action="store_true", help="the board keeps its free space, for large boards")
+    parser_play.add_argument("--show", action="store_true", help="print the board after each block")
+    parser_play.add_argument("--every", type=int, help="print the board every some blocks")
+    parser_play.add_argument("--interval", type=float, help="print the board every some milliseconds")
+    parser_play.add_argument("--diff", action="store_true", help="rewrite only the rows that change, in a terminal")
+    parser_play.add_argument("--record", help="file where the game is recorded")
+    parser_play.add_argument("--profile", help="file where a Chrome trace of the game is saved")
+    parser_play.set_defaults(function=play)
+
+    parser_imports = commands.add_parser("importtime", help="check the time to import the modules")
+    parser_imports.add_argument("modules", nargs="*", default=["cli", "gameboard", "myplayer", "blocks"])
+    parser_imports.add_argument("--budget", type=float, default=100, help="maximum milliseconds of each import")
+    parser_imports.add_argument("--forbid", nargs="*", default=HEAVY_MODULES, help="modules that must not be imported")
+    parser_imports.set_defaults(function=check_imports)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Client of the game server and load generator.
+
+As a script it opens many concurrent sessions, each one playing random blocks,
+and prints the throughput and the latencies of the moves, for instance:
+    python client.py --port 7777 --sessions 200 --blocks 100 --method expert
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from gameboard import *
+from blocks import random_blocks
+from benchmark import summarize
+
+
+class GameClient:
+    """
+    Class of a connection to the server, it can use many sessions
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+
+    @classmethod
+    async def connect(cls, host = "127.0.0.1", port = 7777, unix = None):
+        """
+        Method that opens a connection to a server on a TCP port, or on a Unix socket if unix is given
+        """
+
+        if unix is not None:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+
+    async def request(self, line):
+        """
+        Method that sends a request and returns the words of its response
+        """
+
+        self._writer.write(line.encode() + b"\n")
+        await self._writer.drain()
+        response = await self._reader.readline()
+        if not response:
+            raise Exception("The server closed the connection")
+        words = response.decode().split()
+        if words[0] == "ERR":
+            raise Exception(' '.join(words[1:]))
+        return words
+
+
+    async def new(self, w, h, method = "simple"):
+        """
+        Method that begins a game in a w*h board, returns its session
+        """
+
+        return int((await self.request("NEW " + str(w) + " " + str(h) + " " + method))[1])
+
+
+    async def play(self, session, block):
+        """
+        Method that plays a block in a session, returns its location or None if the game is over
+        """
+
+        words = await self.request("PLAY " + str(session) + " " + str(block.width) + " " + str(block.height))
+        if words[0] == "NONE":
+            return None
+        return Location(int(words[1]), int(words[2]))
+
+
+    async def end(self, session):
+        """
+        Method that finishes a session
+        """
+
+        await self.request("END " + str(session))
+
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def _run_session(client, boardShape, method, n_blocks, seed, latencies):
+    """
+    Auxiliar function that plays a game in a new session, appending the latency of each move
+    Returns the number of blocks placed
+    """
+
+    clock = time.perf_counter
+    session = await client.new(boardShape.width, boardShape.height, method)
+    placed = 0
+    for block in random_blocks(boardShape, n_blocks, seed):
+        start = clock()
+        location = await client.play(session, block)
+        latencies.append(clock() - start)
+        if location is None:
+            break
+        placed += 1
+    await client.end(session)
+    return placed
+
+
+async def run_load(host = "127.0.0.1", port = 7777, unix = None, sessions = 100, boardShape = Shape(10, 10),
+                   method = "simple", n_blocks = 100, seed = 0):
+    """
+    Function that plays many games at the same time, one connection each, and measures the moves
+    Returns a dictionary with the throughput in moves per second and the statistics of the latencies
+    Arguments:
+        host, port, unix -> address of the server, like in GameClient.connect
+        sessions -> number of concurrent games, 100 if not given
+        boardShape -> shape of the boards, 10x10 if not given
+        method -> level of the players, "simple" if not given
+        n_blocks -> maximum number of blocks of each game, 100 if not given
+        seed -> seed of the blocks, each game uses seed + its number; 0 if not given
+    """
+
+    clients = [await GameClient.connect(host, port, unix) for _ in range(sessions)]
+    latencies = []
+    start = time.perf_counter()
+    placed = await asyncio.gather(*(_run_session(client, boardShape, method, n_blocks, seed + k, latencies)
+                                    for k, client in enumerate(clients)))
+    seconds = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+
+    result = summarize(latencies)
+    result["sessions"] = sessions
+    result["placed"] = sum(placed)
+    result["seconds"] = seconds
+    result["moves_per_second"] = len(latencies)/seconds if seconds else 0.0
+    return result
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Load generator for the server of games")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="path of the Unix socket of the server")
+    parser.add_argument("--sessions", type=int, default=100, help="number of concurrent games")
+    parser.add_argument("--board", default="10x10", help="shape of the boards, as WIDTHxHEIGHT")
+    parser.add_argument("--method", default="simple")
+    parser.add_argument("--blocks", type=int, default=100, help="maximum number of blocks of each game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    w, _, h = args.board.partition('x')
+    result = asyncio.run(run_load(args.host, args.port, args.unix, args.sessions, Shape(int(w), int(h)),
+                                  args.method, args.blocks, args.seed))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
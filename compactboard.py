@@ -0,0 +1,103 @@
+from array import array
+
+from gameboard import *
+
+class CompactGameBoard(GameBoard):
+    """
+    Class to create and manipulate the boards of the game, using as little memory as possible.
+    The squares are the bits of a bytearray, each row beginning at a new byte, and the counters
+    are arrays of 16 bits integers. It has the same methods than GameBoard.
+    """
+
+    __slots__ = ('_bits', '_stride')
+
+    def __init__(self, myShape, index = False, free_space = False):
+        """
+        Initialization of the board with a given shape.
+        Arguments:
+            myShape -> shape of the board
+            index -> if asserted, the board keeps an OccupancyIndex, False if not given
+            free_space -> if asserted, the board keeps a FreeSpaceIndex, False if not given
+        Preconditions:
+            myShape must be a valid Shape, with width and height smaller than 65536
+        """
+
+        GameBoard.__init__(self, myShape, index, free_space)
+        if myShape.width >= 65536 or myShape.height >= 65536:
+            raise Exception("The shape is not valid")
+
+        self._row_counters = array('H', self._row_counters)
+        self._column_counters = array('H', self._column_counters)
+
+
+    def row_bits(self, row):
+        start = row*self._stride
+        return int.from_bytes(self._bits[start:start + self._stride], 'little')
+
+    def _set_row_bits(self, row, bits):
+        """
+        Auxiliar method to set a row from an integer, bit j is the square of column j
+        """
+
+        start = row*self._stride
+        self._bits[start:start + self._stride] = bits.to_bytes(self._stride, 'little')
+
+    def _create_board(self):
+        self._stride = (self.get_shape().width + 7)//8
+        self._bits = bytearray(self._stride*self.get_shape().height)
+
+    def _save_board(self):
+        return bytes(self._bits)
+
+    def _load_board(self, saved):
+        self._bits = bytearray(saved)
+
+    def _cell(self, row, column):
+        return self._bits[row*self._stride + (column >> 3)] >> (column & 7) & 1 == 1
+
+    def _rect_count(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        count = 0
+        for i in range(row, row + height):
+            count += (self.row_bits(i) & mask).bit_count()
+        return count
+
+    def _rect_is_empty(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        for i in range(row, row + height):
+            if self.row_bits(i) & mask:
+                return False
+        return True
+
+    def _rect_is_full(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        for i in range(row, row + height):
+            if self.row_bits(i) & mask != mask:
+                return False
+        return True
+
+    def _fill_rect(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        for i in range(row, row + height):
+            self._set_row_bits(i, self.row_bits(i) | mask)
+
+    def _empty_rect(self, row, column, width, height):
+        mask = ((1 << width) - 1) << column
+        for i in range(row, row + height):
+            self._set_row_bits(i, self.row_bits(i) & ~mask)
+
+    def _wipe_row(self, row):
+        bits = self.row_bits(row)
+        wiped = [j for j in range(self.get_shape().width) if bits >> j & 1]
+        self._set_row_bits(row, 0)
+        return wiped
+
+    def _wipe_column(self, column):
+        byte, bit = column >> 3, 1 << (column & 7)
+        wiped = []
+        for i in range(self.get_shape().height):
+            k = i*self._stride + byte
+            if self._bits[k] & bit:
+                self._bits[k] &= ~bit & 0xff
+                wiped.append(i)
+        return wiped
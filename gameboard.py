@@ -1,18 +1,85 @@
 import collections
+import os
+import random
+import threading as _threading
+from array import array as _array
 
 Location = collections.namedtuple('Location', 'row column')
 Shape = collections.namedtuple('Shape', 'width height')
 
+# if asserted, the unchecked methods of the boards check their arguments, for testing
+DEBUG_CHECKS = os.environ.get("HARD_TETRIS_DEBUG", "") not in ("", "0")
+
+# maximum number of shapes whose valid locations a board keeps up to date
+ANCHOR_CACHE_SHAPES = 32
+
+# result of GameBoard.place_and_clear: the rectangle placed and the rows and columns it cleared
+PlaceResult = collections.namedtuple('PlaceResult', 'location shape rows columns')
+
+# copy of all the state of a board, made by GameBoard.snapshot
+_Snapshot = collections.namedtuple('_Snapshot', 'board row_counters column_counters index free anchors hash')
+
+# random keys of the squares for the hash of the boards, the same for all boards of a shape
+# The keys of the last shapes used are kept while they take less than ZOBRIST_MAX_BYTES, and
+# each board keeps the keys of its shape once it has been hashed.
+ZOBRIST_MAX_BYTES = 32*2**20
+_zobrist_keys = collections.OrderedDict()
+_zobrist_bytes = 0
+_zobrist_lock = _threading.Lock()
+
+# strings of the squares of each byte of a row, bit j is the square of column j
+_SQUARES = [''.join('\u2b1b' if k >> j & 1 else '\u2b1c' for j in range(8)) for k in range(256)]
+
+def _row_string(bits, width):
+    """
+    Auxiliar function that returns the string of a row given as an integer, like it is printed
+    """
+    
+    return ''.join([_SQUARES[bits >> k & 0xff] for k in range(0, width, 8)])[:width]
+
+def _zobrist_table(shape):
+    """
+    Auxiliar function that returns the random keys of the squares of a board shape, as rows of 64 bits integers
+    They only depend on the shape, so forgetting them and making them again gives the same keys.
+    """
+    
+    global _zobrist_bytes
+    with _zobrist_lock:
+        keys = _zobrist_keys.get(shape)
+        if keys is not None:
+            _zobrist_keys.move_to_end(shape)
+            return keys
+    
+    rng = random.Random(hash(tuple(shape)))
+    keys = [_array('Q', [rng.getrandbits(64) for j in range(shape.width)]) for i in range(shape.height)]
+    with _zobrist_lock:
+        if shape not in _zobrist_keys:
+            _zobrist_keys[shape] = keys
+            _zobrist_bytes += 8*shape.width*shape.height
+            # forget the shapes that have gone unused for longer
+            while _zobrist_bytes > ZOBRIST_MAX_BYTES and len(_zobrist_keys) > 1:
+                old, _ = _zobrist_keys.popitem(last=False)
+                _zobrist_bytes -= 8*old.width*old.height
+    return keys
+
 class GameBoard:
     """
     Class to create and manipulate the boards of the game.
     """
     
-    def __init__(self, myShape):
+    # the boards have no dictionary of attributes, so that many of them fit in memory
+    __slots__ = ('_board', '_shape', '_row_counters', '_column_counters', '_index', '_free', '_anchors',
+                 '_held_anchors', '_journal', '_checkpoints', '_hash', '_keys')
+    
+    def __init__(self, myShape, index = False, free_space = False):
         """
         Initialization of the board with a given shape.
         Arguments:
             myShape -> shape of the board
+            index -> if asserted, the board keeps an OccupancyIndex to count the full squares of any rectangle fast, False if not given
+                     It only pays off for rectangles of at least its min_area squares, 64 or more, so the
+                     checks of small blocks don't use it.
+            free_space -> if asserted, the board keeps a FreeSpaceIndex to find where a rectangle fits fast, False if not given
         Preconditions:
             myShape must be a valid Shape
         """
@@ -25,55 +92,44 @@ class GameBoard:
         if myShape.width <= 0 or myShape.height <= 0:
             raise Exception("The shape is not valid")
         
-        # Creation of the board, a width*height matrix of booleans
-        # All booleans begin at false, they are all empty
-        self._board = []
-        for j in range(myShape.height):
-            row = []
-            for i in range(myShape.width):
-                row.append(False)
-            self._board.append(row)
-        
-        # initialitzation of all other attributes
+        # initialitzation of all attributes
         self._shape = myShape
+        self._create_board()
         self._row_counters = [0]*myShape.height
         self._column_counters = [0]*myShape.width
+        self._index = OccupancyIndex(myShape) if index else None
+        self._free = FreeSpaceIndex(myShape) if free_space else None
+        self._anchors = {}
+        self._held_anchors = None
+        self._journal = None
+        self._checkpoints = 0
+        self._hash = None
+        self._keys = None
      
     
     def __str__(self):
         """
         Creation of the string to be printed when printing a GameBoard
+        Each row is taken as an integer and made of the strings of its bytes, joined once
         """
         
-        s = ''
-        # for all squares of the board, add its state
-        for i in range(self.get_shape().height-1, -1, -1):
-            for j in range(self.get_shape().width):
-                if not self._board[i][j]:
-                    s += '\u2b1c' # full square
-                else:
-                    s += '\u2b1b' # empty square
-            s += '\n'
-        return s
+        width = self.get_shape().width
+        lines = [_row_string(self.row_bits(i), width) for i in range(self.get_shape().height-1, -1, -1)]
+        return '\n'.join(lines) + '\n'
     
     
     def __repr__(self):
         
-        s = str(self.get_shape().width) + 'x' + str(self.get_shape().height) + ' board: {'
-        
         # for all squares, add it to the list if it's full
-        coma = False
+        squares = []
         for i in range(self.get_shape().height):
-            for j in range(self.get_shape().width):
-                if self._board[i][j]:
-                    if coma:
-                        s += ', '
-                    else:
-                        coma = True
-                    s += '(' + str(i) + ', ' + str(j) + ')'
-        s += '}'
+            bits = self.row_bits(i)
+            while bits:
+                low = bits & -bits
+                squares.append('(' + str(i) + ', ' + str(low.bit_length() - 1) + ')')
+                bits ^= low
         
-        return s
+        return str(self.get_shape().width) + 'x' + str(self.get_shape().height) + ' board: {' + ', '.join(squares) + '}'
     
     
     def get_shape(self):
@@ -84,7 +140,15 @@ class GameBoard:
     
     def column_counters(self):
         return self._column_counters
-
+    
+    def row_bits(self, row):
+        """
+        Method that returns a row as an integer, bit j is the square of column j
+        """
+        
+        return int(''.join(['1' if full else '0' for full in reversed(self._board[row])]), 2)
+    
+    
     def full_rows(self):
         """
         Method to get all full rows of the board.
@@ -135,6 +199,425 @@ class GameBoard:
         return "Fine"
         
     
+    # Storage primitives
+    # They work with raw integers, do not check their arguments and do not touch the counters.
+    # Other board representations only have to redefine these methods.
+    
+    def _create_board(self):
+        """
+        Auxiliar method to create the squares of an empty board
+        """
+        
+        # Creation of the board, a width*height matrix of booleans
+        # All booleans begin at false, they are all empty
+        self._board = []
+        for j in range(self.get_shape().height):
+            row = []
+            for i in range(self.get_shape().width):
+                row.append(False)
+            self._board.append(row)
+    
+    def _save_board(self):
+        """
+        Auxiliar method that returns a copy of the squares, to be given to _load_board
+        """
+        
+        return [row[:] for row in self._board]
+    
+    def _load_board(self, saved):
+        """
+        Auxiliar method to set the squares from a copy made by _save_board
+        """
+        
+        self._board = [row[:] for row in saved]
+    
+    def _cell(self, row, column):
+        """
+        Auxiliar method that returns if a square is full, without any check
+        """
+        
+        return self._board[row][column]
+    
+    def _rect_count(self, row, column, width, height):
+        """
+        Auxiliar method to count the full squares of a rectangle, without any check
+        """
+        
+        count = 0
+        for i in range(row, row + height):
+            count += sum(self._board[i][column:column + width])
+        return count
+    
+    def _rect_is_empty(self, row, column, width, height):
+        """
+        Auxiliar method to check if a rectangle is empty, without any check
+        """
+        
+        # for each square in the rectangle, if it is full the rectangle is not empty
+        for i in range(row, row + height):
+            for j in range(column, column + width):
+                if self._board[i][j]:
+                    return False
+        
+        return True
+    
+    def _rect_is_full(self, row, column, width, height):
+        """
+        Auxiliar method to check if a rectangle is full, without any check
+        """
+        
+        # for each square in the rectangle, if it is empty the rectangle is not full
+        for i in range(row, row + height):
+            for j in range(column, column + width):
+                if not self._board[i][j]:
+                    return False
+        
+        return True
+    
+    def _fill_rect(self, row, column, width, height):
+        """
+        Auxiliar method to set all squares of a rectangle as full
+        """
+        
+        for i in range(row, row + height):
+            board_row = self._board[i]
+            for j in range(column, column + width):
+                board_row[j] = True
+    
+    def _empty_rect(self, row, column, width, height):
+        """
+        Auxiliar method to set all squares of a rectangle as empty
+        """
+        
+        for i in range(row, row + height):
+            board_row = self._board[i]
+            for j in range(column, column + width):
+                board_row[j] = False
+    
+    def _wipe_row(self, row):
+        """
+        Auxiliar method to empty a row
+        Returns the list of columns whose square in the row was full
+        """
+        
+        board_row = self._board[row]
+        wiped = [j for j in range(self.get_shape().width) if board_row[j]]
+        for j in wiped:
+            board_row[j] = False
+        return wiped
+    
+    def _wipe_column(self, column):
+        """
+        Auxiliar method to empty a column
+        Returns the list of rows whose square in the column was full
+        """
+        
+        wiped = [i for i in range(self.get_shape().height) if self._board[i][column]]
+        for i in wiped:
+            self._board[i][column] = False
+        return wiped
+    
+    
+    # Bookkeeping of the structures derived from the squares
+    # All methods that change squares call one of these after doing it.
+    
+    def _cells_filled(self, row, column, width, height):
+        """
+        Auxiliar method to update the derived structures after a rectangle has been filled
+        """
+        
+        if self._journal is not None:
+            self._journal.append((True, row, column, width, height))
+        if self._index is not None:
+            self._index.add(row, column, width, height, 1)
+        if self._free is not None:
+            self._free.add(row, column, width, height, 1)
+        if self._hash is not None:
+            self._hash ^= self._rect_hash(row, column, width, height)
+        self._anchors_filled(row, column, width, height)
+    
+    def _cells_emptied(self, row, column, width, height):
+        """
+        Auxiliar method to update the derived structures after a rectangle has been emptied
+        """
+        
+        if self._journal is not None:
+            self._journal.append((False, row, column, width, height))
+        if self._index is not None:
+            self._index.add(row, column, width, height, -1)
+        if self._free is not None:
+            self._free.add(row, column, width, height, -1)
+        if self._hash is not None:
+            self._hash ^= self._rect_hash(row, column, width, height)
+        self._anchors_emptied(row, column, width, height)
+    
+    def _anchors_filled(self, row, column, width, height):
+        """
+        Auxiliar method to update the cached locations after a rectangle has been filled
+        """
+        
+        # the cached locations whose rectangle overlaps the filled one are not valid anymore
+        for (w, h), anchors in self._anchors.items():
+            if not anchors:
+                continue
+            for i in range(max(0, row - h + 1), min(row + height, self.get_shape().height - h + 1)):
+                for j in range(max(0, column - w + 1), min(column + width, self.get_shape().width - w + 1)):
+                    anchors.discard((i, j))
+    
+    def _anchors_emptied(self, row, column, width, height):
+        """
+        Auxiliar method to update the cached locations after a rectangle has been emptied
+        """
+        
+        # the locations whose rectangle overlaps the emptied one may have become valid
+        for (w, h), anchors in self._anchors.items():
+            for i in range(max(0, row - h + 1), min(row + height, self.get_shape().height - h + 1)):
+                for j in range(max(0, column - w + 1), min(column + width, self.get_shape().width - w + 1)):
+                    if (i, j) not in anchors and self._rect_is_empty(i, j, w, h):
+                        anchors.add(Location(i, j))
+    
+    
+    # Journal of changes
+    # While there is a checkpoint, every rectangle filled or emptied is written down,
+    # so the changes can be undone in time proportional to them.
+    # The cached locations are put aside meanwhile, so trying and undoing moves doesn't update
+    # them twice; the first checkpoint brings them up to date with the changes kept when it finishes.
+    
+    def checkpoint(self):
+        """
+        Method to begin writing down the changes of the board, to undo them with rollback
+        Checkpoints can be nested, each one has to be finished with commit
+        Returns the mark of the checkpoint, to be given to rollback and commit
+        """
+        
+        if self._journal is None:
+            self._journal = []
+        if self._checkpoints == 0:
+            self._held_anchors, self._anchors = self._anchors, {}
+        self._checkpoints += 1
+        return len(self._journal)
+    
+    
+    def rollback(self, mark):
+        """
+        Method to undo all changes made since a checkpoint, which is kept
+        Arguments:
+            mark -> The mark returned by checkpoint
+        """
+        
+        # the changes done while undoing are not written down
+        journal = self._journal
+        self._journal = None
+        while len(journal) > mark:
+            filled, row, column, width, height = journal.pop()
+            if filled:
+                self._empty_rect(row, column, width, height)
+                self._count_rect(row, column, width, height, -1)
+                self._cells_emptied(row, column, width, height)
+            else:
+                self._fill_rect(row, column, width, height)
+                self._count_rect(row, column, width, height, 1)
+                self._cells_filled(row, column, width, height)
+        self._journal = journal
+    
+    
+    def commit(self, mark):
+        """
+        Method to finish a checkpoint keeping the changes made since it
+        They can still be undone by the checkpoints that began before it
+        Arguments:
+            mark -> The mark returned by checkpoint
+        """
+        
+        self._checkpoints -= 1
+        if self._checkpoints == 0:
+            # it was the first checkpoint, there is nothing left to undo
+            journal = self._journal
+            self._journal = None
+            # the cached locations only see the changes kept, in the order they were done
+            self._anchors, self._held_anchors = self._held_anchors, None
+            for filled, row, column, width, height in journal:
+                if filled:
+                    self._anchors_filled(row, column, width, height)
+                else:
+                    self._anchors_emptied(row, column, width, height)
+    
+    
+    def snapshot(self):
+        """
+        Method that returns a copy of the state of the board, to go back to it with restore
+        The squares are copied by whole rows, without going through them one by one.
+        """
+        
+        anchors = {key: set(locations) for key, locations in self._anchors.items()}
+        index = None if self._index is None else self._index.copy()
+        free = None if self._free is None else self._free.copy()
+        return _Snapshot(self._save_board(), self._row_counters[:], self._column_counters[:], index, free, anchors, self._hash)
+    
+    
+    def restore(self, snapshot):
+        """
+        Method to go back to a state of the board returned by snapshot
+        The same snapshot can be restored many times.
+        Arguments:
+            snapshot -> The copy returned by snapshot, of this board
+        Preconditions:
+            There is no checkpoint of the journal not finished
+        """
+        
+        if self._checkpoints:
+            raise Exception("The board can not be restored while there are checkpoints")
+        
+        self._load_board(snapshot.board)
+        self._row_counters[:] = snapshot.row_counters
+        self._column_counters[:] = snapshot.column_counters
+        self._index = None if snapshot.index is None else snapshot.index.copy()
+        self._free = None if snapshot.free is None else snapshot.free.copy()
+        self._anchors = {key: set(locations) for key, locations in snapshot.anchors.items()}
+        self._hash = snapshot.hash
+    
+    
+    def _count_rect(self, row, column, width, height, sign):
+        """
+        Auxiliar method to change the counters after filling (sign 1) or emptying (sign -1) a rectangle
+        """
+        
+        for i in range(row, row + height):
+            self._row_counters[i] += sign*width
+        for j in range(column, column + width):
+            self._column_counters[j] += sign*height
+    
+    
+    # Hash of the board
+    # It is the xor of a random key for each full square (Zobrist hashing), so filling
+    # or emptying squares changes it with a xor of their keys.
+    
+    def board_hash(self):
+        """
+        Method that returns a 64 bits hash of the squares of the board
+        Boards of the same shape and with the same full squares have the same hash.
+        The first call computes it from all squares; afterwards it is kept up to date by
+        the methods that change the board, in time proportional to the squares changed.
+        """
+        
+        if self._hash is None:
+            self._hash = 0
+            for i in range(self.get_shape().height):
+                for j in range(self.get_shape().width):
+                    if self._rect_is_full(i, j, 1, 1):
+                        self._hash ^= self._rect_hash(i, j, 1, 1)
+        return self._hash
+    
+    
+    def _rect_hash(self, row, column, width, height):
+        """
+        Auxiliar method that returns the xor of the keys of the squares of a rectangle
+        """
+        
+        keys = self._keys
+        if keys is None:
+            keys = self._keys = _zobrist_table(self.get_shape())
+        
+        h = 0
+        for i in range(row, row + height):
+            keys_row = keys[i]
+            for j in range(column, column + width):
+                h ^= keys_row[j]
+        return h
+    
+    
+    def valid_locations(self, checkShape):
+        """
+        Method to get all locations where a rectangle of a given shape can be put.
+        The first time it is called for a shape, the whole board is checked. Afterwards the
+        locations are kept up to date by the methods that change the board, which only check
+        the locations near the changed squares. Only the last shapes asked for are kept, and
+        none are kept while there is a checkpoint.
+        Returns a set of Locations that must not be modified
+        Arguments:
+            checkShape -> The shape of the rectangle
+        Preconditions:
+            checkShape is a valid shape that fits in the board
+        """
+        
+        # checking that checkShape is valid
+        s = self._are_valid_Shape_and_Location(Location(0, 0), checkShape)
+        if s != "Fine":
+            raise Exception(s)
+        
+        if self._checkpoints:
+            return set(self.fitting_locations(checkShape))
+        
+        key = (checkShape.width, checkShape.height)
+        anchors = self._anchors.pop(key, None)
+        if anchors is None:
+            # first time: check the whole board, row by row
+            anchors = set(self.fitting_locations(checkShape))
+            # forget the shape that has gone unused for longer
+            if len(self._anchors) >= ANCHOR_CACHE_SHAPES:
+                del self._anchors[next(iter(self._anchors))]
+        
+        # the dictionary keeps the shapes from least to most recently used
+        self._anchors[key] = anchors
+        return anchors
+    
+    
+    def _free_rows(self):
+        """
+        Auxiliar method that returns the rows of the board as integers whose bit j is set if the square of column j is empty
+        """
+        
+        if self._free is not None:
+            return self._free.rows()
+        full = (1 << self.get_shape().width) - 1
+        return [~self.row_bits(i) & full for i in range(self.get_shape().height)]
+    
+    
+    def fitting_locations(self, checkShape):
+        """
+        Method to get all locations where a rectangle of a given shape can be put, in order
+        The rows of the board are checked as integers, many squares at once, and the time to go
+        through the locations found is proportional to their number.
+        Returns a list of Locations sorted by row and then by column
+        Arguments:
+            checkShape -> The shape of the rectangle
+        Preconditions:
+            checkShape is a valid shape that fits in the board
+        """
+        
+        s = self._are_valid_Shape_and_Location(Location(0, 0), checkShape)
+        if s != "Fine":
+            raise Exception(s)
+        
+        locations = []
+        for i, bits in enumerate(_fitting_rows(self._free_rows(), checkShape)):
+            while bits:
+                low = bits & -bits
+                locations.append(Location(i, low.bit_length() - 1))
+                bits ^= low
+        return locations
+    
+    
+    def first_location(self, checkShape):
+        """
+        Method to get the first location, by row and then by column, where a rectangle of a given shape can be put
+        Returns the Location, or None if the rectangle can not be put anywhere
+        Arguments:
+            checkShape -> The shape of the rectangle
+        Preconditions:
+            checkShape is a valid shape that fits in the board
+        """
+        
+        s = self._are_valid_Shape_and_Location(Location(0, 0), checkShape)
+        if s != "Fine":
+            raise Exception(s)
+        
+        for i, bits in enumerate(_fitting_rows(self._free_rows(), checkShape)):
+            if bits:
+                return Location(i, (bits & -bits).bit_length() - 1)
+        return None
+    
+    
     def is_empty(self, checkLocation, checkShape = Shape(1, 1)):
         """
         Method to check if a rectangle is empty. If no shape is given, the rectangle is 1x1, a square.
@@ -150,13 +633,7 @@ class GameBoard:
         if s != "Fine":
             raise Exception(s)
         
-        # for each square in the rectangle, if it is full the rectangle is not empty
-        for i in range(checkLocation.row, checkLocation.row + checkShape.height):
-            for j in range(checkLocation.column, checkLocation.column + checkShape.width):
-                if self._board[i][j]:
-                    return False
-        
-        return True
+        return self.empty_at(checkLocation.row, checkLocation.column, checkShape.width, checkShape.height)
     
     def is_full(self, checkLocation, checkShape = Shape(1, 1)):
         """
@@ -173,13 +650,26 @@ class GameBoard:
         if s != "Fine":
             raise Exception(s)
         
-        # for each square in the rectangle, if it is empty the rectangle is not full
-        for i in range(checkLocation.row, checkLocation.row + checkShape.height):
-            for j in range(checkLocation.column, checkLocation.column + checkShape.width):
-                if not self._board[i][j]:
-                    return False
+        return self.full_at(checkLocation.row, checkLocation.column, checkShape.width, checkShape.height)
+    
+    def count_filled(self, checkLocation, checkShape = Shape(1, 1)):
+        """
+        Method to count the full squares of a rectangle. If no shape is given, the rectangle is 1x1, a square.
+        Arguments:
+            checkLocation -> The location of bottom left square of the rectangle
+            checkShape -> The shape of the rectangle, optional argument
+        Preconditions:
+            checkLocation and checkShape are a valid location and shape, respectively
+        """
         
-        return True
+        # checking that checkLocation and checkShape are valid
+        s = self._are_valid_Shape_and_Location(checkLocation, checkShape)
+        if s != "Fine":
+            raise Exception(s)
+        
+        if self._index is not None:
+            return self._index.count(checkLocation.row, checkLocation.column, checkShape.width, checkShape.height)
+        return self._rect_count(checkLocation.row, checkLocation.column, checkShape.width, checkShape.height)
     
     def clear_rows(self, clearRows):
         """
@@ -194,10 +684,11 @@ class GameBoard:
         
         # clear the squares and change the column counters
         for i in clearRows:
-            for j in range(self.get_shape().width):
-                if self._board[i][j]:
-                    self._column_counters[j] -= 1
-                    self._board[i][j] = False
+            wiped = self._wipe_row(i)
+            for j in wiped:
+                self._column_counters[j] -= 1
+            for start, length in _runs(wiped):
+                self._cells_emptied(i, start, length, 1)
                     
         return self
     
@@ -213,11 +704,12 @@ class GameBoard:
             self._column_counters[i] = 0
             
         # clear the squares and change the row counters
-        for i in range(self.get_shape().height):
-            for j in clearColumns:
-                if self._board[i][j]:
-                    self._row_counters[i] -= 1
-                    self._board[i][j] = False
+        for j in clearColumns:
+            wiped = self._wipe_column(j)
+            for i in wiped:
+                self._row_counters[i] -= 1
+            for start, length in _runs(wiped):
+                self._cells_emptied(start, j, 1, length)
                     
         return self
         
@@ -241,20 +733,36 @@ class GameBoard:
             # the location or the shape are not valid
             raise ex
         
-        # actualize the squares of the board
-        for i in range(putLocation.row, putLocation.row + putShape.height):
-            for j in range(putLocation.column, putLocation.column + putShape.width):
-                self._board[i][j] = True
-        
-        # actualize the modified counters
-        for i in range(putLocation.row, putLocation.row + putShape.height):
-            self._row_counters[i] += putShape.width
-        for j in range(putLocation.column, putLocation.column + putShape.width):
-            self._column_counters[j] += putShape.height
+        # actualize the squares of the board and the modified counters
+        self.put_at(putLocation.row, putLocation.column, putShape.width, putShape.height)
         
         return self
     
     
+    def place_and_clear(self, putLocation, putShape = Shape(1, 1)):
+        """
+        Method to put a rectangle and clear the rows and columns it fills. If no shape is given, the rectangle is 1x1, a square.
+        It is the same than put followed by clearing full_rows and full_columns, but it checks the arguments
+        once and only looks at the counters of the rows and columns of the rectangle, so it costs the size
+        of the rectangle and of the cleared lines, not the size of the board.
+        Returns a PlaceResult with the location, the shape and the lists of cleared rows and columns
+        Arguments:
+            putLocation -> The location of bottom left square of the rectangle
+            putShape -> The shape of the rectangle, optional argument
+        Preconditions:
+            putLocation and putShape are a valid location and shape, respectively
+            The rectangle is to be put at an empty spot
+            There are no full rows or columns before putting it, they would not be cleared
+        """
+        
+        # checking if the arguments are valid, is_empty raises if the location or the shape are not valid
+        if not self.is_empty(putLocation, putShape):
+            raise Exception("What you want to fill is not empty")
+        
+        rows, columns = self.place_and_clear_at(putLocation.row, putLocation.column, putShape.width, putShape.height)
+        return PlaceResult(putLocation, putShape, rows, columns)
+    
+    
     def remove(self, removeLocation, removeShape = Shape(1, 1)):
         """
         Method to remove a rectangle. If no shape is given, the rectangle is 1x1, a square.
@@ -274,15 +782,313 @@ class GameBoard:
             # the location or the shape are not valid
             raise ex
         
-        # actualize the squares of the board
-        for i in range(removeLocation.row, removeLocation.row + removeShape.height):
-            for j in range(removeLocation.column, removeLocation.column + removeShape.width):
-                self._board[i][j] = False
-        
-        # actualize the modified counters
-        for i in range(removeLocation.row, removeLocation.row + removeShape.height):
-            self._row_counters[i] -= removeShape.width
-        for j in range(removeLocation.column, removeLocation.column + removeShape.width):
-            self._column_counters[j] -= removeShape.height
+        # actualize the squares of the board and the modified counters
+        self.remove_at(removeLocation.row, removeLocation.column, removeShape.width, removeShape.height)
         
         return self
+    
+    
+    # Unchecked methods
+    # They are the same than the methods above, but with integers instead of locations and shapes,
+    # and without checking their arguments, so they are faster. They are meant for the players and
+    # searches that already know their arguments are right. If DEBUG_CHECKS is asserted, they check
+    # them anyway and raise an exception like the methods above.
+    
+    def square_full(self, row, column):
+        """
+        Unchecked method that returns if the square (row, column) is full
+        """
+        
+        if DEBUG_CHECKS:
+            self._debug_check(row, column, 1, 1)
+        return self._cell(row, column)
+    
+    def empty_at(self, row, column, width = 1, height = 1):
+        """
+        Unchecked method that returns if a rectangle is empty
+        """
+        
+        if DEBUG_CHECKS:
+            self._debug_check(row, column, width, height)
+        if self._index is not None and width*height >= self._index.min_area:
+            return self._index.count(row, column, width, height) == 0
+        return self._rect_is_empty(row, column, width, height)
+    
+    def full_at(self, row, column, width = 1, height = 1):
+        """
+        Unchecked method that returns if a rectangle is full
+        """
+        
+        if DEBUG_CHECKS:
+            self._debug_check(row, column, width, height)
+        if self._index is not None and width*height >= self._index.min_area:
+            return self._index.count(row, column, width, height) == width*height
+        return self._rect_is_full(row, column, width, height)
+    
+    def put_at(self, row, column, width = 1, height = 1):
+        """
+        Unchecked method to put a rectangle, that must be empty
+        """
+        
+        if DEBUG_CHECKS:
+            self._debug_check(row, column, width, height)
+            if not self._rect_is_empty(row, column, width, height):
+                raise Exception("What you want to fill is not empty")
+        self._fill_rect(row, column, width, height)
+        self._count_rect(row, column, width, height, 1)
+        self._cells_filled(row, column, width, height)
+    
+    def remove_at(self, row, column, width = 1, height = 1):
+        """
+        Unchecked method to remove a rectangle, that must be full
+        """
+        
+        if DEBUG_CHECKS:
+            self._debug_check(row, column, width, height)
+            if not self._rect_is_full(row, column, width, height):
+                raise Exception("What you want to remove is not full")
+        self._empty_rect(row, column, width, height)
+        self._count_rect(row, column, width, height, -1)
+        self._cells_emptied(row, column, width, height)
+    
+    def place_and_clear_at(self, row, column, width = 1, height = 1):
+        """
+        Unchecked method to put a rectangle, that must be empty, and clear the rows and columns it fills
+        Returns the lists of cleared rows and columns
+        """
+        
+        self.put_at(row, column, width, height)
+        
+        # only the rows and columns of the rectangle can have been filled
+        rows = [i for i in range(row, row + height) if self._row_counters[i] == self.get_shape().width]
+        columns = [j for j in range(column, column + width) if self._column_counters[j] == self.get_shape().height]
+        if rows:
+            self.clear_rows(rows)
+        if columns:
+            self.clear_columns(columns)
+        return rows, columns
+    
+    def _debug_check(self, row, column, width, height):
+        """
+        Auxiliar method that checks the arguments of the unchecked methods when DEBUG_CHECKS is asserted
+        """
+        
+        s = self._are_valid_Shape_and_Location(Location(row, column), Shape(width, height))
+        if s != "Fine":
+            raise Exception(s)
+        if width <= 0 or height <= 0:
+            raise Exception("The shape is not a valid shape")
+
+
+
+class OccupancyIndex:
+    """
+    Class to count the full squares of any rectangle of a board.
+    It is a summed-area table stored as a two dimensional Fenwick tree, so that
+    adding a value to a whole rectangle and counting a rectangle both cost
+    O(log(height)*log(width)) instead of O(width*height).
+    """
+    
+    __slots__ = ('_height', '_width', 'min_area', '_trees')
+    
+    def __init__(self, myShape):
+        """
+        Initialization of the index of an empty board with a given shape.
+        Arguments:
+            myShape -> shape of the board
+        """
+        
+        self._height = myShape.height
+        self._width = myShape.width
+        
+        # a count costs around this number of steps, smaller rectangles are faster to check square by square
+        self.min_area = 4*myShape.height.bit_length()*myShape.width.bit_length()
+        
+        # four trees, indexed from 1, needed to add to rectangles and not only to squares
+        size = (myShape.height + 1)*(myShape.width + 1)
+        self._trees = ([0]*size, [0]*size, [0]*size, [0]*size)
+    
+    
+    def copy(self):
+        """
+        Method that returns a copy of the index
+        """
+        
+        other = OccupancyIndex.__new__(OccupancyIndex)
+        other._height = self._height
+        other._width = self._width
+        other.min_area = self.min_area
+        other._trees = tuple(list(tree) for tree in self._trees)
+        return other
+    
+    
+    def _add_corner(self, x, y, value):
+        """
+        Auxiliar method to add value to all squares (i, j) with i >= x and j >= y, indexed from 1
+        """
+        
+        t1, t2, t3, t4 = self._trees
+        stride = self._width + 1
+        i = x
+        while i <= self._height:
+            j = y
+            while j <= self._width:
+                k = i*stride + j
+                t1[k] += value
+                t2[k] += value*x
+                t3[k] += value*y
+                t4[k] += value*x*y
+                j += j & -j
+            i += i & -i
+    
+    
+    def _prefix(self, x, y):
+        """
+        Auxiliar method to count the full squares (i, j) with i <= x and j <= y, indexed from 1
+        """
+        
+        t1, t2, t3, t4 = self._trees
+        stride = self._width + 1
+        a = b = c = d = 0
+        i = x
+        while i > 0:
+            j = y
+            while j > 0:
+                k = i*stride + j
+                a += t1[k]
+                b += t2[k]
+                c += t3[k]
+                d += t4[k]
+                j -= j & -j
+            i -= i & -i
+        return a*(x + 1)*(y + 1) - b*(y + 1) - c*(x + 1) + d
+    
+    
+    def add(self, row, column, width, height, value):
+        """
+        Method to add a value to all squares of a rectangle
+        Arguments:
+            row, column -> The bottom left square of the rectangle
+            width, height -> The shape of the rectangle
+            value -> 1 when the squares are filled, -1 when they are emptied
+        """
+        
+        x1, y1 = row + 1, column + 1
+        x2, y2 = row + height + 1, column + width + 1
+        self._add_corner(x1, y1, value)
+        self._add_corner(x1, y2, -value)
+        self._add_corner(x2, y1, -value)
+        self._add_corner(x2, y2, value)
+    
+    
+    def count(self, row, column, width, height):
+        """
+        Method to count the full squares of a rectangle
+        Arguments:
+            row, column -> The bottom left square of the rectangle
+            width, height -> The shape of the rectangle
+        """
+        
+        x2, y2 = row + height, column + width
+        return self._prefix(x2, y2) - self._prefix(row, y2) - self._prefix(x2, column) + self._prefix(row, column)
+
+
+class FreeSpaceIndex:
+    """
+    Class of the free space of a board, to find where a rectangle fits with operations on whole rows.
+    Each row is an integer whose bit j is set if the square of column j is empty.
+    """
+    
+    __slots__ = ('_width', '_free')
+    
+    def __init__(self, myShape):
+        """
+        Initialization of the index of an empty board with a given shape.
+        Arguments:
+            myShape -> shape of the board
+        """
+        
+        self._width = myShape.width
+        self._free = [(1 << myShape.width) - 1]*myShape.height
+    
+    
+    def copy(self):
+        """
+        Method that returns a copy of the index
+        """
+        
+        other = FreeSpaceIndex.__new__(FreeSpaceIndex)
+        other._width = self._width
+        other._free = self._free[:]
+        return other
+    
+    
+    def rows(self):
+        """
+        Method that returns the list of the rows as integers, it must not be modified
+        """
+        
+        return self._free
+    
+    
+    def add(self, row, column, width, height, value):
+        """
+        Method to fill or empty all squares of a rectangle
+        Arguments:
+            row, column -> The bottom left square of the rectangle
+            width, height -> The shape of the rectangle
+            value -> 1 when the squares are filled, -1 when they are emptied
+        """
+        
+        mask = ((1 << width) - 1) << column
+        free = self._free
+        if value > 0:
+            for i in range(row, row + height):
+                free[i] &= ~mask
+        else:
+            for i in range(row, row + height):
+                free[i] |= mask
+
+
+def _fitting_rows(free, checkShape):
+    """
+    Auxiliar function that returns, for each row where a shape can be put, an integer whose bit j
+    is set if the shape fits with its bottom left square at that row and column j
+    Arguments:
+        free -> the rows of the board, with the bits of the empty squares set
+        checkShape -> the shape
+    """
+    
+    # the columns where width empty squares begin, doubling the run each step
+    width = checkShape.width
+    rows = list(free)
+    k = 1
+    while 2*k <= width:
+        rows = [bits & (bits >> k) for bits in rows]
+        k *= 2
+    if width > k:
+        rows = [bits & (bits >> (width - k)) for bits in rows]
+    
+    # the same with the rows, for height rows
+    height = checkShape.height
+    k = 1
+    while 2*k <= height:
+        rows = [rows[i] & rows[i + k] for i in range(len(rows) - k)]
+        k *= 2
+    if height > k:
+        rows = [rows[i] & rows[i + height - k] for i in range(len(rows) - (height - k))]
+    return rows
+
+
+def _runs(positions):
+    """
+    Auxiliar function that groups a sorted list of positions into (start, length) runs of consecutive positions
+    """
+    
+    runs = []
+    for p in positions:
+        if runs and runs[-1][0] + runs[-1][1] == p:
+            runs[-1][1] += 1
+        else:
+            runs.append([p, 1])
+    return runs
@@ -0,0 +1,111 @@
+"""
+Memory accounting of boards and players, to know how many games fit in a host.
+
+As a script it prints the bytes of a player of each backend, for instance:
+    python memory.py --board 10x10 --method expert --games 50000
+"""
+
+import argparse
+import sys
+import types
+
+from gameboard import *
+from myplayer import MyPlayer, EXPERT_WEIGHTS, play_game
+from blocks import random_blocks
+
+
+def deep_sizeof(obj, shared = ()):
+    """
+    Function that returns the bytes of an object and of all the objects it refers to
+    Objects shared by all games are not counted: classes, modules, functions, small integers,
+    None and booleans, the shapes' keys of the hash and the objects given in shared.
+    Arguments:
+        obj -> the object to be measured
+        shared -> objects that are not counted, nor what they refer to
+    """
+
+    seen = set(id(x) for x in shared)
+    total = 0
+    stack = [obj]
+    while stack:
+        x = stack.pop()
+        if id(x) in seen:
+            continue
+        seen.add(id(x))
+        if x is None or isinstance(x, (bool, type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)):
+            continue
+        if isinstance(x, int) and -5 <= x <= 256:
+            # small integers exist only once in the interpreter
+            continue
+
+        total += sys.getsizeof(x)
+        if isinstance(x, dict):
+            stack.extend(x.keys())
+            stack.extend(x.values())
+        elif isinstance(x, (list, tuple, set, frozenset)):
+            stack.extend(x)
+        else:
+            if hasattr(x, '__dict__'):
+                stack.append(x.__dict__)
+            for cls in type(x).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    if hasattr(x, name):
+                        stack.append(getattr(x, name))
+    return total
+
+
+def board_bytes(board):
+    """
+    Function that returns the bytes of a board, without the objects shared with other boards
+    """
+
+    return deep_sizeof(board, (board.get_shape(), board._keys))
+
+
+def player_bytes(player):
+    """
+    Function that returns the bytes of a player and its board, without the objects shared with other players
+    """
+
+    return deep_sizeof(player, (player._board.get_shape(), player._board._keys, EXPERT_WEIGHTS))
+
+
+def games_bytes(n, w, h, method = "simple", blocks = 0, **options):
+    """
+    Function that estimates the bytes of n concurrent games, measuring one player
+    Arguments:
+        n -> number of games
+        w, h -> width and height of the boards
+        method -> level of the players, "simple" if not given
+        blocks -> random blocks played before measuring, since some structures grow while playing; 0 if not given
+        options -> other arguments for MyPlayer
+    """
+
+    player = MyPlayer(w, h, method, **options)
+    if blocks:
+        play_game(player, random_blocks(Shape(w, h), blocks), show=False)
+    return n*player_bytes(player)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Memory of the players of each backend")
+    parser.add_argument("--board", default="10x10", help="shape of the boards, as WIDTHxHEIGHT")
+    parser.add_argument("--method", default="simple")
+    parser.add_argument("--games", type=int, default=10000, help="number of concurrent games")
+    parser.add_argument("--blocks", type=int, default=20, help="random blocks played before measuring")
+    args = parser.parse_args(argv)
+
+    w, _, h = args.board.partition('x')
+    w, h = int(w), int(h)
+    # the simple player never uses the cache, so its boards are the same with it or without it
+    caches = (False,) if args.method == "simple" else (True, False)
+    for backend in ("list", "bit", "compact"):
+        for cache in caches:
+            one = games_bytes(1, w, h, args.method, args.blocks, backend=backend, cache=cache)
+            print("{:8} cache={:5}  {:9d} bytes per game  {:10.1f} MiB for {} games".format(
+                backend, str(cache), one, one*args.games/2**20, args.games))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,32 @@
+import collections
+import heapq
+import itertools
+import time
+
 from gameboard import *
+from bitboard import BitGameBoard
+from compactboard import CompactGameBoard
+from placements import placement_table, TOP, BOTTOM, LEFT, RIGHT, TOP_LEFT, TOP_RIGHT, BOTTOM_RIGHT, BOTTOM_LEFT
+from transposition import TranspositionTable
+
+# weights of the punctuation of the expert player
+# its optimal value has been found experimentally
+# initially, they were [100, 98, 10000, -1000, 0.01, 6]
+EXPERT_WEIGHTS = [101.73623919534931, 102.59966534850058, 10179.484568034057, -965.5994719665939, 0.009403568796147519, 5.690955955544556]
 
 class MyPlayer:
     """
     Class to create a player to play the game
     """
     
-    def __init__(self, w, h, method = "simple"):
+    # the players have no dictionary of attributes, so that many of them fit in memory
+    __slots__ = ('_board', '_simple', '_cache', '_vectorized', '_weights', '_suma_adjacent', '_suma_borde',
+                 '_petar', '_petar_voltant', '_casi_petar', '_resta_diag', '_last_placement',
+                 '_depth', '_beam', '_branching', '_time_budget', '_table', '_prune', '_free_space')
+    
+    def __init__(self, w, h, method = "simple", backend = "list", cache = False, vectorized = True, weights = None,
+                 depth = 3, beam = 8, branching = 4, time_budget = None, table = None, prune = False,
+                 free_space = False, index = False):
         """
         Initialitzation of the player with the dimensions of its board and its level
         Returns nothing
@@ -13,41 +34,129 @@ class MyPlayer:
             w -> width of the board
             h -> height of the board
             method -> level of the player, "simple" if not given
+                      "lookahead" is the expert player searching over the next blocks, when it knows them
+            backend -> representation of the board, "list" (GameBoard), "bit" (BitGameBoard) or
+                       "compact" (CompactGameBoard), "list" if not given
+            cache -> if asserted, the board keeps the valid locations of the shapes played up to date and the
+                     expert player takes its candidates from them, also when it punctuates them at once;
+                     False if not given
+                     Keeping them costs time on every change of the board, so it only pays off for expert
+                     players in boards where the blocks fit in few places.
+            vectorized -> if asserted and NumPy is installed, the expert player punctuates all locations at once, True if not given
+            weights -> the six weights of the punctuation of the expert player, EXPERT_WEIGHTS if not given
+            depth -> number of upcoming blocks searched by the lookahead player, 3 if not given
+            beam -> number of sequences of placements kept at each step of the search, 8 if not given
+            branching -> number of best punctuated locations tried for each block in the search, 4 if not given
+            time_budget -> seconds the search can last for each move, no limit if not given
+            table -> TranspositionTable, or its maximum bytes, where the expert player remembers its
+                     decisions for each board and shape; no table if not given
+            prune -> if asserted, the expert player punctuates the locations from the most promising one and
+                     stops when no other one can be better, choosing the same location; False if not given
+            free_space -> if asserted, the board keeps a FreeSpaceIndex and the player finds the locations
+                          where a shape fits with it, also when it punctuates them at once; for large
+                          boards, False if not given
+            index -> if asserted, the board keeps an OccupancyIndex, that only checks faster the rectangles
+                     much bigger than the blocks of the game; False if not given
         Preconditions:
             w and h must be positive integers
-            method must be either "simple" or "expert" if given
+            method must be either "simple", "expert" or "lookahead" if given
+            backend must be either "list", "bit" or "compact" if given
+            weights must be a list of six numbers if given
         """
         
-        # creation of the board to be played in
-        try:
-            self._board = GameBoard(Shape(w, h))
-        except Exception as ex:
-            # the given arguments were not valid
-            raise ex
-        
         #  initialitzation of boolean _simple, to store the method
         if method == "simple":
             self._simple = True
-        elif method == "expert":
+        elif method == "expert" or method == "lookahead":
             self._simple = False
         else:
             raise Exception("Demanded method doesn't exist")
+        
+        self._last_placement = None
+        
+        # parameters of the search of the lookahead player
+        self._depth = depth if method == "lookahead" else 0
+        self._beam = beam
+        self._branching = branching
+        self._time_budget = time_budget
+        
+        # transposition table of the expert player
+        if table is None or isinstance(table, TranspositionTable):
+            self._table = table
+        else:
+            self._table = TranspositionTable(table)
+        
+        # choice of the class of the board
+        if backend == "list":
+            board_class = GameBoard
+        elif backend == "bit":
+            board_class = BitGameBoard
+        elif backend == "compact":
+            board_class = CompactGameBoard
+        else:
+            raise Exception("Demanded backend doesn't exist")
+        
+        # creation of the board to be played in
+        try:
+            self._board = board_class(Shape(w, h), index = index, free_space = free_space)
+        except Exception as ex:
+            # the given arguments were not valid
+            raise ex
+        
+        self._cache = cache
+        self._prune = prune
+        self._free_space = free_space
+        # NumPy is only imported by the players that use it
+        self._vectorized = False
+        if vectorized and not self._simple:
+            import scoring
+            self._vectorized = scoring.HAVE_NUMPY
+        
+        # weights of the punctuation of the expert player
+        if weights is None:
+            weights = EXPERT_WEIGHTS
+        if len(weights) != 6:
+            raise Exception("There must be six weights")
+        self._weights = weights if weights is EXPERT_WEIGHTS else [float(x) for x in weights]
+        self._suma_adjacent = self._weights[0]
+        self._suma_borde = self._weights[1]
+        self._petar = self._weights[2]
+        self._petar_voltant = self._weights[3]
+        self._casi_petar = self._weights[4]
+        self._resta_diag = self._weights[5]
     
     
     def __str__(self):
         return self._board.__str__()
     
     
+    def get_board(self):
+        """
+        Method that returns the board of the player, it must not be changed
+        """
+        
+        return self._board
+    
+    
+    def lookahead(self):
+        """
+        Method that returns how many upcoming blocks the player wants to know when playing
+        """
+        
+        return self._depth
+    
+    
     def _clear_full(self):
         """
         Auxiliar method to clear all full rows and columns
-        Returns nothing
+        Returns the number of rows and columns cleared
         """
         
         full_columns = self._board.full_columns()
         full_rows = self._board.full_rows()
         self._board.clear_rows(full_rows)
         self._board.clear_columns(full_columns)
+        return len(full_rows) + len(full_columns)
     
     
     def place_block(self, placeLocation, placeShape = Shape(1, 1)):
@@ -62,19 +171,25 @@ class MyPlayer:
             The rectangle to be placed is empty
         """
         
-        # place the block
+        # place the block and clear rows and columns that have been filled
+        # the board never has full rows or columns between moves, so only the ones of the block are checked
         try:
-            self._board.put(placeLocation, placeShape)
+            self._last_placement = self._board.place_and_clear(placeLocation, placeShape)
         except Exception as ex:
             # the preconditions were not fulfilled
             raise ex
         
-        # clear rows and columns that have been filled
-        self._clear_full()
-        
         return self
     
     
+    def last_placement(self):
+        """
+        Method that returns the PlaceResult of the last block placed, with the rows and columns it cleared, or None
+        """
+        
+        return self._last_placement
+    
+    
     def is_legal(self, checkShape):
         """
         Method that returns if a shape is legal
@@ -94,29 +209,47 @@ class MyPlayer:
         return True
     
     
-    def play(self, placeShape):
+    def play(self, placeShape, upcoming = ()):
         """
         Method to play a given shape. Its positioning depends on the level of the player
         Returns the location decided to place the shape
         Arguments:
             placeShape -> shape to be placed
+            upcoming -> shapes that will be played next, only used by the lookahead player, optional argument
         """
         
         # chcking the shape is legal
         if not self.is_legal(placeShape):
             raise Exception("The shape is not legal")
         
+        if self._depth and upcoming:
+            return self._play_lookahead(placeShape, upcoming)
+        
 
+        if not self._simple and self._table is not None:
+            return self._play_transposition(placeShape)
+        
+        if self._simple and self._free_space:
+            return self._board.first_location(placeShape)
+        
+        if not self._simple and self._prune:
+            best = self._best_pruned(placeShape)
+            return best[1] if best else None
+        
+        if not self._simple and self._vectorized:
+            import scoring
+            return scoring.best_location(self._board, placeShape, self._weights, self._board_locations(placeShape))
+        
+        if not self._simple and (self._cache or self._free_space):
+            return self._play_cached(placeShape)
+        
         if self._simple:
             # simple player
             # checks in order where can it place the shape and returns the first possible
-            for r in range(self._board.get_shape().height):
-                for c in range(self._board.get_shape().width):
-                    try:
-                        if self._board.is_empty(Location(row=r, column=c), placeShape):
-                            return Location(row=r, column=c)
-                    except:
-                        continue
+            for r in range(self._board.get_shape().height - placeShape.height +1):
+                for c in range(self._board.get_shape().width - placeShape.width +1):
+                    if self._board.empty_at(r, c, placeShape.width, placeShape.height):
+                        return Location(row=r, column=c)
             return None
         
         else:
@@ -129,16 +262,286 @@ class MyPlayer:
                 for c in range(self._board.get_shape().width - placeShape.width +1):
                     
                     # if the location is a posible placing spot
-                    if self._board.is_empty(Location(row=r, column=c), placeShape):
+                    if self._board.empty_at(r, c, placeShape.width, placeShape.height):
                         # punctuate it
-                        punct = self._punctuation(Location(row=r, column=c), placeShape)
+                        loc = Location(row=r, column=c)
+                        punct = self._punctuation(loc, placeShape)
                         if punct > best_punct:
                             best_punct = punct
-                            best_Location = Location(row=r, column=c)
+                            best_Location = loc
                     
             return best_Location
+    
+    
+    def _locations(self, placeShape):
+        """
+        Auxiliar method that returns the valid locations to place a shape, found with the free space
+        index or kept by the board, or checking the whole board if the player has neither
+        """
+        
+        if self._free_space:
+            return self._board.fitting_locations(placeShape)
+        if self._cache:
+            return self._board.valid_locations(placeShape)
+        return [Location(r, c) for r in range(self._board.get_shape().height - placeShape.height + 1)
+                               for c in range(self._board.get_shape().width - placeShape.width + 1)
+                               if self._board.empty_at(r, c, placeShape.width, placeShape.height)]
+    
+    
+    def _board_locations(self, placeShape):
+        """
+        Auxiliar method that returns the valid locations to place a shape found with the free space index
+        or kept by the board, or None if the player has neither and they have to be searched
+        """
+        
+        if self._free_space or self._cache:
+            return self._locations(placeShape)
+        return None
+    
+    
+    def _play_cached(self, placeShape):
+        """
+        Auxiliar method to play a given shape like the expert player, choosing among the valid locations
+        found by the board. It returns the same location than play does without them
+        Arguments:
+            placeShape -> shape to be placed
+        """
+        
+        anchors = self._locations(placeShape)
+        if not anchors:
+            return None
+        
+        # the best punctuated location, the first in order if there is a tie
+        best_punct = -1000000
+        best_Location = None
+        for loc in anchors:
+            punct = self._punctuation(loc, placeShape)
+            if punct > best_punct or (punct == best_punct and best_Location is not None and loc < best_Location):
+                best_punct = punct
+                best_Location = loc
+        return best_Location
 
 
+    def _play_transposition(self, placeShape):
+        """
+        Auxiliar method to play a given shape like the expert player, remembering the decisions
+        in the transposition table, so a board and a shape already seen are not punctuated again
+        Arguments:
+            placeShape -> shape to be placed
+        """
+        
+        key = (self._board.board_hash(), placeShape.width, placeShape.height)
+        found = self._table.get(key)
+        
+        # two boards with the same hash are almost impossible, but the location is checked anyway
+        if found is None or (found[1] is not None and not self._board.empty_at(found[1].row, found[1].column, placeShape.width, placeShape.height)):
+            best = self._candidates(placeShape, 1)
+            found = best[0] if best else (None, None)
+            self._table.put(key, found)
+        
+        return found[1]
+    
+    
+    def table_stats(self):
+        """
+        Method that returns the counters of the transposition table as a dictionary, or None if there is no table
+        """
+        
+        return None if self._table is None else self._table.stats()
+    
+    
+    def _candidates(self, placeShape, count):
+        """
+        Auxiliar method that returns the best locations to place a shape, as a list of (punctuation, location)
+        They are sorted like the expert player chooses them, so the first one is the one it would play
+        Arguments:
+            placeShape -> shape to be placed
+            count -> maximum number of locations returned
+        """
+        
+        if self._prune and count == 1:
+            best = self._best_pruned(placeShape)
+            return [best] if best else []
+        
+        if self._vectorized:
+            import scoring
+            return scoring.best_locations(self._board, placeShape, self._weights, count, self._board_locations(placeShape))
+        
+        anchors = self._locations(placeShape)
+        
+        scored = []
+        for loc in anchors:
+            punct = self._punctuation(loc, placeShape)
+            if punct > -1000000:
+                scored.append((punct, loc))
+        scored.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        return scored[:count]
+    
+    
+    def _line_sums(self, counters, full, size):
+        """
+        Auxiliar method that returns the sums of the terms of the rows (or the columns) of the punctuation
+        The term of the line k is the one _punctuation adds when the shape covers it, and element k of
+        the result is the sum of the terms of the lines before k, so the terms of any location are
+        the difference of two elements.
+        Arguments:
+            counters -> counters of the rows (or the columns)
+            full -> counter of a line that gets filled, the width (or the height) of the board minus the shape's
+            size -> height (or width) of the shape
+        """
+        
+        sums = [0.0]
+        for k in range(len(counters)):
+            if counters[k] == full:
+                term = counters[k]*self._petar
+                if k > 0:
+                    term += counters[k-1]*self._petar_voltant
+                if k < size-1:
+                    term += counters[k+1]*self._petar_voltant
+            else:
+                term = counters[k]*self._casi_petar
+            sums.append(sums[-1] + term)
+        return sums
+    
+    
+    def _best_pruned(self, placeShape):
+        """
+        Auxiliar method that returns the best location to place a shape as (punctuation, location), or None
+        It is the same location than the expert player chooses, but the locations are punctuated
+        from the greatest upper bound of their punctuation, and the rest is not punctuated once
+        their bound can not reach the best punctuation found.
+        The bound adds the same terms than _punctuation, with the full squares adjacent to a location
+        counted with sums of the rows and the columns made once per move, but it is never below 0,
+        since the locations without anything adjacent are punctuated 0. The terms of the border
+        are taken from the PlacementTable of the shapes.
+        Arguments:
+            placeShape -> shape to be placed
+        """
+        
+        W, H = self._board.get_shape().width, self._board.get_shape().height
+        w, h = placeShape.width, placeShape.height
+        
+        anchors = self._locations(placeShape)
+        if not anchors:
+            return None
+        
+        # squares of the board, and the number of full squares before each one in its row and in its column
+        square_full = self._board.square_full
+        cells = [[square_full(i, j) for j in range(W)] for i in range(H)]
+        in_row = [list(itertools.accumulate(row, initial=0)) for row in cells]
+        in_column = [list(itertools.accumulate(column, initial=0)) for column in zip(*cells)]
+        
+        rows = self._line_sums(self._board.row_counters(), W - w, h)
+        columns = self._line_sums(self._board.column_counters(), H - h, w)
+        
+        table = placement_table(self._board.get_shape(), placeShape)
+        border, corners, inside, n = table.border, table.corners, table.inside, table.columns
+        
+        heap = []
+        for loc in anchors:
+            r, c = loc.row, loc.column
+            k = r*n + c
+            sides = inside[k]
+            
+            # only the squares that are not on the border depend on the board
+            adjacent = ((sides & TOP and in_row[r-1][c+w] - in_row[r-1][c])
+                        + (sides & BOTTOM and in_row[r+h][c+w] - in_row[r+h][c])
+                        + (sides & LEFT and in_column[c-1][r+h] - in_column[c-1][r])
+                        + (sides & RIGHT and in_column[c+w][r+h] - in_column[c+w][r]))
+            diagonal = (corners[k] + (sides & TOP_LEFT and cells[r-1][c-1]) + (sides & TOP_RIGHT and cells[r-1][c+w])
+                        + (sides & BOTTOM_RIGHT and cells[r+h][c+w]) + (sides & BOTTOM_LEFT and cells[r+h][c-1]))
+            
+            bound = (border[k]*self._suma_borde + adjacent*self._suma_adjacent - diagonal*self._resta_diag
+                     + rows[r + h] - rows[r] + columns[c + w] - columns[c])
+            heap.append((-bound if bound > 0 else 0, loc))
+        heapq.heapify(heap)
+        
+        # margin for the rounding errors, the terms are not added in the same order than _punctuation
+        best_punct = -1000000
+        best_Location = None
+        while heap:
+            bound, loc = heapq.heappop(heap)
+            if -bound < best_punct - 1e-9*max(1, abs(best_punct)):
+                break
+            punct = self._punctuation(loc, placeShape)
+            if punct > best_punct or (punct == best_punct and best_Location is not None and loc < best_Location):
+                best_punct = punct
+                best_Location = loc
+        
+        return None if best_Location is None else (best_punct, best_Location)
+    
+    
+    def _play_lookahead(self, placeShape, upcoming):
+        """
+        Auxiliar method to play a given shape searching over the next ones with a beam search
+        Each sequence of placements is valued by the number of blocks placed, then by the rows and
+        columns cleared, and then by the sum of the punctuations. The changes of the board are undone
+        with its journal, so the search doesn't copy it. If the time budget runs out, the best sequence
+        found so far is used, or the location of the expert player if only the first shape was searched.
+        Arguments:
+            placeShape -> shape to be placed
+            upcoming -> shapes that will be played next
+        """
+        
+        deadline = None if self._time_budget is None else time.perf_counter() + self._time_budget
+        
+        # the shapes searched, until the first one that could never be placed
+        shapes = [placeShape]
+        for shape in itertools.islice(upcoming, self._depth):
+            if not self.is_legal(shape):
+                break
+            shapes.append(shape)
+        
+        first = self._candidates(placeShape, self._branching)
+        if not first:
+            return None
+        
+        board = self._board
+        mark = board.checkpoint()
+        try:
+            # each node is (value, locations of the shapes placed)
+            beam = [((0, 0, 0.0), [])]
+            ended = []
+            for step, shape in enumerate(shapes):
+                children = []
+                for value, path in beam:
+                    if deadline is not None and time.perf_counter() > deadline and step > 0:
+                        break
+                    
+                    # go to the board of the node
+                    board.rollback(mark)
+                    for loc, placed in zip(path, shapes):
+                        board.place_and_clear_at(loc.row, loc.column, placed.width, placed.height)
+                    
+                    candidates = first if step == 0 else self._candidates(shape, self._branching)
+                    if not candidates:
+                        ended.append((value, path))
+                    for punct, loc in candidates:
+                        child = board.checkpoint()
+                        rows, columns = board.place_and_clear_at(loc.row, loc.column, shape.width, shape.height)
+                        cleared = len(rows) + len(columns)
+                        board.rollback(child)
+                        board.commit(child)
+                        children.append(((value[0] + 1, value[1] + cleared, value[2] + punct), path + [loc]))
+                
+                if not children:
+                    break
+                # the best children, keeping the order of the candidates if there is a tie
+                children.sort(key=lambda node: node[0], reverse=True)
+                beam = children[:self._beam]
+                if deadline is not None and time.perf_counter() > deadline:
+                    if step == 0:
+                        # the next shapes were not searched, the shape is placed like the expert player does
+                        return first[0][1]
+                    break
+        finally:
+            board.rollback(mark)
+            board.commit(mark)
+        
+        value, path = max(beam + ended, key=lambda node: node[0])
+        return path[0] if path else first[0][1]
+    
+    
     def _punctuation(self, checkLocation, checkShape):
         """
         Method that returns the punctuation of a location to place a shape
@@ -148,19 +551,7 @@ class MyPlayer:
             checkShape -> shape to be placed
         """
         
-        # initialitzation of some variables
-        # its optimal value has been found experimentally
-        x = [101.73623919534931, 102.59966534850058, 10179.484568034057, -965.5994719665939, 0.009403568796147519, 5.690955955544556]
-        
-        self._suma_adjacent = x[0]
-        self._suma_borde = x[1]
-        self._petar = x[2]
-        self._petar_voltant = x[3] 
-        self._casi_petar = x[4]
-        self._resta_diag = x[5]
-        
-        # initially, x was [100, 98, 10000, -1000, 0.01, 6]
-        
+        # the weights of the punctuation, "self._suma_adjacent" and the others, are given in the initialitzation
         
         punctuation = 0
         
@@ -171,23 +562,23 @@ class MyPlayer:
         for i in range(checkShape.width):
             if checkLocation.row == 0 or checkLocation.column + i >= self._board.get_shape().width:
                 punctuation += self._suma_borde
-            elif self._board.is_full(Location(checkLocation.row-1, checkLocation.column + i)):
+            elif self._board.square_full(checkLocation.row-1, checkLocation.column + i):
                 punctuation += self._suma_adjacent
                 
             if checkLocation.row+checkShape.height >= self._board.get_shape().height or checkLocation.column + i >= self._board.get_shape().width:
                 punctuation += self._suma_borde
-            elif self._board.is_full(Location(checkLocation.row+checkShape.height, checkLocation.column + i)):
+            elif self._board.square_full(checkLocation.row+checkShape.height, checkLocation.column + i):
                 punctuation += self._suma_adjacent
                 
         for i in range(checkShape.height):
             if (checkLocation.column == 0 or checkLocation.row + i >= self._board.get_shape().height):
                 punctuation += self._suma_borde
-            elif self._board.is_full(Location(checkLocation.row+i, checkLocation.column-1)):
+            elif self._board.square_full(checkLocation.row+i, checkLocation.column-1):
                 punctuation += self._suma_adjacent
                 
             if checkLocation.column+checkShape.width >= self._board.get_shape().width or checkLocation.row + i >= self._board.get_shape().height:
                 punctuation += self._suma_borde
-            elif self._board.is_full(Location(checkLocation.row+i, checkLocation.column + checkShape.width)):
+            elif self._board.square_full(checkLocation.row+i, checkLocation.column + checkShape.width):
                 punctuation += self._suma_adjacent
                 
         
@@ -199,22 +590,22 @@ class MyPlayer:
             # if it belongs to the border or is full: subtract a value, "self._resta_diag"
         if checkLocation.row == 0 or checkLocation.column == 0:
             punctuation -= self._resta_diag
-        elif self._board.is_full(Location(checkLocation.row-1, checkLocation.column-1)):
+        elif self._board.square_full(checkLocation.row-1, checkLocation.column-1):
             punctuation -= self._resta_diag
            
         if checkLocation.row == 0 or checkLocation.column + checkShape.width == self._board.get_shape().width:
             punctuation -= self._resta_diag
-        elif self._board.is_full(Location(checkLocation.row-1, checkLocation.column + checkShape.width)):
+        elif self._board.square_full(checkLocation.row-1, checkLocation.column + checkShape.width):
             punctuation -= self._resta_diag
         
         if checkLocation.row + checkShape.height == self._board.get_shape().height or checkLocation.column + checkShape.width == self._board.get_shape().width:
             punctuation -= self._resta_diag
-        elif self._board.is_full(Location(checkLocation.row + checkShape.height, checkLocation.column + checkShape.width)):
+        elif self._board.square_full(checkLocation.row + checkShape.height, checkLocation.column + checkShape.width):
             punctuation -= self._resta_diag
         
         if checkLocation.row + checkShape.height == self._board.get_shape().height or checkLocation.column == 0:
             punctuation -= self._resta_diag
-        elif self._board.is_full(Location(checkLocation.row + checkShape.height, checkLocation.column-1)):
+        elif self._board.square_full(checkLocation.row + checkShape.height, checkLocation.column-1):
             punctuation -= self._resta_diag
             
         
@@ -251,30 +642,55 @@ class MyPlayer:
 
 
 
-def play_game(player, blocks, show=True):
+def play_game(player, blocks, show=True, recorder=None):
     """It plays the blocks puzzle using a pre-defined player. If show is asserted, the state of the player 
     is printed after placing each block. It returns the number of blocks that could be placed.
+    The blocks can be any iterable of shapes, such as blocks.iter_blocks, and no more blocks are
+    taken from it once a block can not be placed.
+    If the player has a lookahead method, it is also given the next blocks it asks for.
+    If a recorder.GameRecorder is given, each move is recorded with its time, and also the block
+    that could not be placed.
+    Instead of True, show can be a render.Display, that only shows the board every some moves or
+    milliseconds and can rewrite only the rows that changed.
     """
-    if show: print(player)
+    display = show if hasattr(show, "update") else None
+    if display is not None: display.update(player.get_board(), force=True)
+    elif show: print(player)
     count = 0
-    for block in blocks:
+    window = player.lookahead() if hasattr(player, "lookahead") else 0
+    blocks = iter(blocks)
+    upcoming = collections.deque()
+    while True:
+        # the current block and the ones after it that the player wants to know
+        for block in itertools.islice(blocks, window + 1 - len(upcoming)):
+            upcoming.append(block)
+        if not upcoming: break
+        block = upcoming.popleft()
         assert player.is_legal(block)
-        loc = player.play(block)
-        if loc is None: break
+        if recorder is not None: start = time.perf_counter()
+        loc = player.play(block, tuple(upcoming)) if window else player.play(block)
+        if loc is None:
+            if recorder is not None: recorder.record(block, None, seconds=time.perf_counter() - start)
+            break
         player.place_block(loc, block)
+        if recorder is not None: recorder.record_placement(player.last_placement(), time.perf_counter() - start)
         count += 1
-        if show: print(player)
+        if display is not None:
+            # the display only looks at the rows the block changed, if the player tells them
+            display.update(player.get_board(), placement=player.last_placement() if hasattr(player, "last_placement") else None)
+        elif show: print(player)
+    if display is not None: display.finish(player.get_board())
     return count
 
 
-import urllib.request
-
 def read_file(file, url=True):
     """It reads a file of integers representing shapes. Each pair of consecutive integers represents
     a shape (width and height). It returns a list of shapes. If url is not asserted, file is assumed
     to be the name of a local file.
     """
     if url:
+        # only imported when it is needed, it takes long
+        import urllib.request
         with urllib.request.urlopen(file) as reader:
             items = reader.read().split()
     else:
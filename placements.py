@@ -0,0 +1,104 @@
+"""
+Tables of the parts of the punctuation of a location that only depend on the shapes.
+
+For a board shape and a block shape, the squares around each location that are on the border
+are always the same, so they are computed once and shared by all the players, keeping the
+tables of the last pairs of shapes used while they take less than MAX_TABLE_BYTES. A table
+takes 4 bytes per location, about 4 MB for a small block in a 1000x1000 board.
+"""
+
+import collections
+import threading
+from array import array
+
+from gameboard import *
+
+# maximum number of bytes of the arrays of the tables kept, the last table built is kept anyway
+MAX_TABLE_BYTES = 64*2**20
+
+# sides and corners of a location that are not on the border, as bits of PlacementTable.inside
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+TOP_LEFT, TOP_RIGHT, BOTTOM_RIGHT, BOTTOM_LEFT = 16, 32, 64, 128
+
+# table of a board shape and a block shape, location (r, c) is at index r*columns + c of the arrays:
+#   rows, columns -> number of rows and columns where the block can be placed
+#   border -> number of squares adjacent to the block that are on the border
+#   corners -> number of squares diagonally adjacent to the block that are on the border
+#   inside -> bits of the sides and corners that are not on the border
+PlacementTable = collections.namedtuple('PlacementTable', 'rows columns border corners inside')
+
+_tables = collections.OrderedDict()
+_bytes = 0
+_lock = threading.Lock()
+
+
+def placement_table(boardShape, blockShape):
+    """
+    Function that returns the PlacementTable of a board shape and a block shape, built only the first time
+    Preconditions:
+        The block fits in the board
+    """
+
+    key = (boardShape.width, boardShape.height, blockShape.width, blockShape.height)
+    with _lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+
+    global _bytes
+    table = _build(boardShape, blockShape)
+    with _lock:
+        # another thread may have built it meanwhile
+        old = _tables.pop(key, None)
+        if old is not None:
+            _bytes -= table_bytes(old)
+        _tables[key] = table
+        _bytes += table_bytes(table)
+        # forget the tables that have gone unused for longer
+        while _bytes > MAX_TABLE_BYTES and len(_tables) > 1:
+            _bytes -= table_bytes(_tables.popitem(last=False)[1])
+    return table
+
+
+def table_bytes(table):
+    """
+    Function that returns the number of bytes of the arrays of a PlacementTable
+    """
+
+    return sum(len(values)*values.itemsize for values in (table.border, table.corners, table.inside))
+
+
+def _build(boardShape, blockShape):
+    """
+    Auxiliar function that builds a PlacementTable
+    """
+
+    W, H = boardShape.width, boardShape.height
+    w, h = blockShape.width, blockShape.height
+    rows, columns = H - h + 1, W - w + 1
+
+    border = array('H')
+    corners = array('B')
+    inside = array('B')
+    for r in range(rows):
+        for c in range(columns):
+            top, bottom, left, right = r == 0, r + h == H, c == 0, c + w == W
+            border.append(w*(top + bottom) + h*(left + right))
+            corners.append((top or left) + (top or right) + (bottom or right) + (bottom or left))
+            inside.append((not top)*TOP | (not bottom)*BOTTOM | (not left)*LEFT | (not right)*RIGHT
+                          | (not (top or left))*TOP_LEFT | (not (top or right))*TOP_RIGHT
+                          | (not (bottom or right))*BOTTOM_RIGHT | (not (bottom or left))*BOTTOM_LEFT)
+
+    return PlacementTable(rows, columns, border, corners, inside)
+
+
+def clear_tables():
+    """
+    Function to forget all the tables
+    """
+
+    global _bytes
+    with _lock:
+        _tables.clear()
+        _bytes = 0
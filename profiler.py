@@ -0,0 +1,309 @@
+"""
+Opt-in instrumentation of the players and the boards.
+
+A Profiler counts the calls and the time of the methods of a player and its board, the
+candidate locations checked and punctuated in each move, and the latency of the moves.
+It only changes the class of the objects it instruments, to a subclass whose methods are
+measured, so the objects that are not instrumented run exactly the same code than before.
+The candidates are only counted while a move is being played, and a method that checks
+candidates only counts the ones it checks itself, not the ones of the methods it calls.
+The vectorized expert player checks and punctuates all the locations of the board at once,
+which scoring tells to the profiler through its candidates_hook.
+For instance:
+    profiler = Profiler(trace=True)
+    profiler.instrument_player(player)
+    play_game(player, blocks, show=False)
+    print(profiler.to_json())
+    profiler.write_chrome_trace("trace.json")
+The trace can be opened with chrome://tracing or https://ui.perfetto.dev as a flame graph.
+"""
+
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# methods measured by default
+PLAYER_METHODS = ('play', 'place_block', '_clear_full', '_play_cached', '_play_transposition',
+                  '_play_lookahead', '_candidates', '_best_pruned', '_punctuation')
+BOARD_METHODS = ('valid_locations', 'fitting_locations', 'first_location', 'is_empty', 'is_full', 'empty_at',
+                 'count_filled', 'put', 'place_and_clear', 'full_rows', 'full_columns', 'clear_rows', 'clear_columns')
+
+# methods that check one candidate location, return the candidate locations, or the first one
+_SCAN_METHODS = ('is_empty', 'empty_at')
+_ANCHOR_METHODS = ('valid_locations', 'fitting_locations')
+_FIRST_METHODS = ('first_location',)
+_CANDIDATE_METHODS = _SCAN_METHODS + _ANCHOR_METHODS + _FIRST_METHODS
+# methods that punctuate one candidate location
+_SCORE_METHODS = ('_punctuation',)
+
+
+def _checked(name, args, result):
+    """
+    Auxiliar function that returns the number of candidate locations checked by a call of a method of the board
+    Arguments:
+        name -> name of the method
+        args -> arguments of the call, the board and the shape first for the methods of the locations
+        result -> what the call returned
+    """
+
+    if name in _SCAN_METHODS:
+        return 1
+    if name in _ANCHOR_METHODS:
+        return len(result)
+
+    # the locations before the first one, in order, have been checked too
+    board, checkShape = args[0], args[1]
+    columns = board.get_shape().width - checkShape.width + 1
+    if result is None:
+        return (board.get_shape().height - checkShape.height + 1)*columns
+    return result.row*columns + result.column + 1
+
+
+def _bucket(value):
+    """
+    Auxiliar function that returns the bucket of a histogram of a non negative value
+    Bucket 0 has the value 0 and bucket k the values from 2**(k-1) to 2**k - 1
+    """
+
+    return int(value).bit_length()
+
+
+class Profiler:
+    """
+    Class that measures the methods of the objects it instruments
+    The times of the methods include the time of the methods they call.
+    """
+
+    def __init__(self, trace = False, max_events = 1000000):
+        """
+        Initialization of a profiler without measures.
+        Arguments:
+            trace -> if asserted, each call is kept as an event of the Chrome trace, False if not given
+            max_events -> maximum number of events kept, 1000000 if not given
+        """
+
+        self.calls = collections.Counter()
+        self.seconds = collections.Counter()
+        self.moves = 0
+        self.scanned = 0
+        self.scored = 0
+        # histograms of the moves: latency in microseconds, locations checked and locations punctuated
+        self.latency_histogram = collections.Counter()
+        self.scanned_histogram = collections.Counter()
+        self.scored_histogram = collections.Counter()
+
+        self._events = [] if trace else None
+        self._max_events = max_events
+        self._origin = time.perf_counter()
+        self._classes = {}
+        # number of calls of play and of the methods of the candidates that have not finished
+        self._playing = 0
+        self._checking = 0
+
+
+    def _wrap(self, label, name, method):
+        """
+        Auxiliar method that returns the measured version of a method
+        Arguments:
+            label -> name of the method in the measures
+            name -> name of the method in its class
+            method -> function of the method
+        """
+
+        profiler = self
+        clock = time.perf_counter
+
+        candidates = name in _CANDIDATE_METHODS
+
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            start = clock()
+            if name == 'play':
+                scanned, scored = profiler.scanned, profiler.scored
+                profiler._playing += 1
+            elif candidates:
+                profiler._checking += 1
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                if name == 'play':
+                    profiler._playing -= 1
+                elif candidates:
+                    profiler._checking -= 1
+            end = clock()
+
+            profiler.calls[label] += 1
+            profiler.seconds[label] += end - start
+            if candidates:
+                # the checks of the moves that are not done by another method of the candidates
+                if profiler._playing and not profiler._checking:
+                    profiler.scanned += _checked(name, args, result)
+            elif name in _SCORE_METHODS:
+                profiler.scored += 1
+            elif name == 'play':
+                profiler._move(end - start, profiler.scanned - scanned, profiler.scored - scored)
+
+            events = profiler._events
+            if events is not None and len(events) < profiler._max_events:
+                events.append((label, start, end, threading.get_ident()))
+            return result
+
+        return measured
+
+
+    def _vectorized(self, scanned, scored):
+        """
+        Auxiliar method to count the locations checked and punctuated at once by scoring
+        """
+
+        if self._playing:
+            self.scanned += scanned
+            self.scored += scored
+
+
+    def _move(self, seconds, scanned, scored):
+        """
+        Auxiliar method that adds a move to the histograms
+        """
+
+        self.moves += 1
+        self.latency_histogram[_bucket(seconds*1e6)] += 1
+        self.scanned_histogram[_bucket(scanned)] += 1
+        self.scored_histogram[_bucket(scored)] += 1
+
+
+    def instrument(self, obj, methods):
+        """
+        Method to measure some methods of an object, changing its class to a measured subclass
+        Arguments:
+            obj -> object to be instrumented, a player or a board
+            methods -> names of the methods measured, the ones its class doesn't have are ignored
+        """
+
+        cls = type(obj)
+        if getattr(cls, '_profiled_class', None) is not None:
+            raise Exception("The object is already instrumented")
+
+        key = (cls, tuple(methods))
+        measured = self._classes.get(key)
+        if measured is None:
+            namespace = {'__slots__': (), '_profiled_class': cls}
+            for name in methods:
+                method = getattr(cls, name, None)
+                if callable(method):
+                    namespace[name] = self._wrap(cls.__name__ + '.' + name, name, method)
+            measured = type(cls.__name__, (cls,), namespace)
+            self._classes[key] = measured
+
+        obj.__class__ = measured
+
+
+    def release(self, obj):
+        """
+        Method that gives back its original class to an instrumented object
+        """
+
+        cls = getattr(type(obj), '_profiled_class', None)
+        if cls is not None:
+            obj.__class__ = cls
+
+
+    def instrument_player(self, player, player_methods = PLAYER_METHODS, board_methods = BOARD_METHODS):
+        """
+        Method to measure a MyPlayer and its board
+        """
+
+        self.instrument(player, player_methods)
+        self.instrument(player._board, board_methods)
+        if getattr(player, '_vectorized', False):
+            # the player has already imported scoring
+            import scoring
+            scoring.candidates_hook = self._vectorized
+
+
+    def release_player(self, player):
+        """
+        Method that gives back their original classes to a player and its board
+        """
+
+        self.release(player._board)
+        self.release(player)
+        scoring = sys.modules.get('scoring')
+        if scoring is not None and scoring.candidates_hook == self._vectorized:
+            scoring.candidates_hook = None
+
+
+    def reset(self):
+        """
+        Method to forget all the measures, the instrumented objects keep being measured
+        """
+
+        self.__init__(self._events is not None, self._max_events)
+
+
+    def stats(self):
+        """
+        Method that returns the measures as a dictionary, ready to be saved as JSON
+        The histograms map the lower limit of each bucket to its number of moves.
+        """
+
+        def histogram(counter):
+            return {str(1 << (k - 1) if k else 0): counter[k] for k in sorted(counter)}
+
+        methods = {}
+        for label in sorted(self.calls, key=lambda label: -self.seconds[label]):
+            methods[label] = {
+                "calls": self.calls[label],
+                "seconds": self.seconds[label],
+                "mean_us": self.seconds[label]/self.calls[label]*1e6,
+            }
+
+        return {
+            "methods": methods,
+            "moves": self.moves,
+            "scanned": self.scanned,
+            "scored": self.scored,
+            "scanned_per_move": self.scanned/self.moves if self.moves else 0.0,
+            "scored_per_move": self.scored/self.moves if self.moves else 0.0,
+            "latency_us_histogram": histogram(self.latency_histogram),
+            "scanned_histogram": histogram(self.scanned_histogram),
+            "scored_histogram": histogram(self.scored_histogram),
+        }
+
+
+    def to_json(self, indent = 2):
+        """
+        Method that returns the measures as a JSON string
+        """
+
+        return json.dumps(self.stats(), indent=indent)
+
+
+    def chrome_trace(self):
+        """
+        Method that returns the events in the Chrome trace format, as a dictionary
+        """
+
+        if self._events is None:
+            raise Exception("The profiler doesn't keep a trace")
+
+        pid = os.getpid()
+        events = [{"name": label, "ph": "X", "pid": pid, "tid": tid,
+                   "ts": (start - self._origin)*1e6, "dur": (end - start)*1e6}
+                  for label, start, end, tid in self._events]
+        # the events are kept when the calls end, the viewers want them by beginning
+        events.sort(key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+    def write_chrome_trace(self, path):
+        """
+        Method to save the events in the Chrome trace format in a file
+        """
+
+        with open(path, "w") as writer:
+            json.dump(self.chrome_trace(), writer)
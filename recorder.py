@@ -0,0 +1,266 @@
+"""
+Recording of games in a compact binary log, and their deterministic replay.
+
+The log begins with a header and then has a record for each move, appended as the game goes:
+    header -> magic (4 bytes), version, width and height of the board, reserved (unsigned 16 bits each)
+    move   -> width and height of the shape, row and column of its location, number of rows and
+              of columns cleared (unsigned 16 bits each), microseconds of the move (unsigned 32 bits),
+              and then the rows and the columns cleared (unsigned 16 bits each)
+All the integers are little endian. A block that could not be placed, the end of the game, has
+NO_LOCATION as row and column. A move cut at the end of the file, because the game was
+interrupted while writing it, is ignored when reading.
+
+For instance, to record a game and look at the board after its move 1000:
+    with GameRecorder("game.htgm", Shape(50, 50)) as recorder:
+        play_game(player, blocks, show=False, recorder=recorder)
+    log = GameLog("game.htgm")
+    print(log.board(1000))
+or, as a script:
+    python recorder.py game.htgm --move 1000
+"""
+
+import argparse
+import collections
+import struct
+import sys
+
+from gameboard import *
+
+GAME_MAGIC = b'HTGM'
+GAME_VERSION = 1
+NO_LOCATION = 0xffff
+NO_TIME = 0xffffffff
+
+_HEADER = struct.Struct('<4sHHHH')
+_MOVE = struct.Struct('<HHHHHHI')
+_LINE = struct.Struct('<H')
+
+# a move of a log, location is None if the block could not be placed and seconds is None if not timed
+Move = collections.namedtuple('Move', 'shape location rows columns seconds')
+
+
+class GameRecorder:
+    """
+    Class that appends the moves of a game to a log
+    """
+
+    def __init__(self, name, boardShape, append = False):
+        """
+        Initialization of a recorder, creating its log
+        Arguments:
+            name -> name of the file of the log
+            boardShape -> shape of the board of the game, its width and height must be smaller than 65535
+            append -> if asserted, the moves are added to an existing log of the same board shape, False if not given
+        """
+
+        if not (0 < boardShape.width < NO_LOCATION and 0 < boardShape.height < NO_LOCATION):
+            raise Exception("The shape is not valid")
+        self._shape = boardShape
+
+        if append:
+            with open(name, "rb") as reader:
+                logShape, _, end = _parse(reader.read(), name)
+            if logShape != boardShape:
+                raise Exception("The file " + name + " is not a log of a game in this board")
+            # a move cut at the end is overwritten
+            self._writer = open(name, "r+b")
+            self._writer.truncate(end)
+            self._writer.seek(end)
+        else:
+            self._writer = open(name, "wb")
+            self._writer.write(_HEADER.pack(GAME_MAGIC, GAME_VERSION, boardShape.width, boardShape.height, 0))
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def record(self, shape, location, rows = (), columns = (), seconds = None):
+        """
+        Method to append a move to the log
+        Arguments:
+            shape -> shape of the block
+            location -> location where it was placed, None if it could not be placed
+            rows, columns -> rows and columns cleared by the block, none if not given
+            seconds -> time of the move, optional argument
+        """
+
+        if location is None:
+            row = column = NO_LOCATION
+        else:
+            row, column = location.row, location.column
+        micros = NO_TIME if seconds is None else min(int(seconds*1e6), NO_TIME - 1)
+
+        self._writer.write(_MOVE.pack(shape.width, shape.height, row, column, len(rows), len(columns), micros))
+        for line in rows:
+            self._writer.write(_LINE.pack(line))
+        for line in columns:
+            self._writer.write(_LINE.pack(line))
+
+
+    def record_placement(self, placement, seconds = None):
+        """
+        Method to append a move given as the PlaceResult of the block placed
+        """
+
+        self.record(placement.shape, placement.location, placement.rows, placement.columns, seconds)
+
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+
+def read_moves(name):
+    """
+    Function that reads a log and returns the shape of its board and the list of its moves
+    """
+
+    with open(name, "rb") as reader:
+        boardShape, moves, _ = _parse(reader.read(), name)
+    return boardShape, moves
+
+
+def _parse(data, name):
+    """
+    Auxiliar function that returns the shape of the board, the moves and the end of the last complete move of a log
+    """
+
+    if len(data) < _HEADER.size:
+        raise Exception("The file " + name + " is not a log of a game")
+    magic, version, width, height, _ = _HEADER.unpack_from(data)
+    if magic != GAME_MAGIC or version != GAME_VERSION:
+        raise Exception("The file " + name + " is not a log of a game")
+
+    moves = []
+    k = _HEADER.size
+    while k + _MOVE.size <= len(data):
+        w, h, row, column, n_rows, n_columns, micros = _MOVE.unpack_from(data, k)
+        end = k + _MOVE.size + 2*(n_rows + n_columns)
+        if end > len(data):
+            # the last move was not written completely
+            break
+        lines = struct.unpack_from('<' + str(n_rows + n_columns) + 'H', data, k + _MOVE.size)
+        location = None if row == NO_LOCATION else Location(row, column)
+        seconds = None if micros == NO_TIME else micros/1e6
+        moves.append(Move(Shape(w, h), location, list(lines[:n_rows]), list(lines[n_rows:]), seconds))
+        k = end
+
+    return Shape(width, height), moves, k
+
+
+class GameLog:
+    """
+    Class to replay a log, rebuilding the board after any of its moves
+    Each keyframe_interval moves, a snapshot of the board is kept when it is replayed, so going to
+    a move only replays the moves from the keyframe before it.
+    """
+
+    def __init__(self, name, keyframe_interval = 256, board_class = GameBoard):
+        """
+        Initialization of the replay of a log
+        Arguments:
+            name -> name of the file of the log
+            keyframe_interval -> number of moves between two keyframes, 256 if not given
+            board_class -> class of the boards rebuilt, GameBoard if not given
+        """
+
+        if keyframe_interval <= 0:
+            raise Exception("The interval between keyframes must be positive")
+
+        self._shape, self._moves = read_moves(name)
+        self._interval = keyframe_interval
+        self._board = board_class(self._shape)
+        # the board has the first self._position moves, keyframe k has the first k*interval moves
+        self._position = 0
+        self._keyframes = [self._board.snapshot()]
+
+
+    def __len__(self):
+        return len(self._moves)
+
+    def __getitem__(self, i):
+        return self._moves[i]
+
+    def __iter__(self):
+        return iter(self._moves)
+
+
+    def get_shape(self):
+        return self._shape
+
+
+    def placed(self):
+        """
+        Method that returns the number of blocks placed in the game
+        """
+
+        return sum(1 for move in self._moves if move.location is not None)
+
+
+    def _seek(self, n):
+        """
+        Auxiliar method to take the board of the replay to the first n moves
+        """
+
+        if not 0 <= n <= len(self._moves):
+            raise Exception("The log doesn't have " + str(n) + " moves")
+
+        keyframe = min(n//self._interval, len(self._keyframes) - 1)
+        if n < self._position or keyframe*self._interval > self._position:
+            self._board.restore(self._keyframes[keyframe])
+            self._position = keyframe*self._interval
+
+        while self._position < n:
+            move = self._moves[self._position]
+            if move.location is not None:
+                result = self._board.place_and_clear(move.location, move.shape)
+                if sorted(result.rows) != sorted(move.rows) or sorted(result.columns) != sorted(move.columns):
+                    raise Exception("The log doesn't match the game at move " + str(self._position))
+            self._position += 1
+            if self._position % self._interval == 0 and self._position//self._interval == len(self._keyframes):
+                self._keyframes.append(self._board.snapshot())
+
+
+    def board(self, n = None):
+        """
+        Method that returns a new board with the first n moves of the log, or all of them if n is not given
+        """
+
+        self._seek(len(self._moves) if n is None else n)
+        board = type(self._board)(self._shape)
+        board.restore(self._board.snapshot())
+        return board
+
+
+    def verify(self):
+        """
+        Method that replays the whole log, raising an exception if a block can not be placed where
+        it was or doesn't clear the same rows and columns
+        """
+
+        self._seek(len(self._moves))
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Replay of the log of a game")
+    parser.add_argument("log", help="file of the log")
+    parser.add_argument("--move", type=int, help="number of moves replayed before printing the board, all if not given")
+    args = parser.parse_args(argv)
+
+    log = GameLog(args.log)
+    timed = [move.seconds for move in log if move.seconds is not None]
+    print(len(log), "moves,", log.placed(), "blocks placed in a", log.get_shape().width, "x", log.get_shape().height, "board")
+    if timed:
+        print("{:.1f} us per move, {:.1f} us the slowest".format(sum(timed)/len(timed)*1e6, max(timed)*1e6))
+    print(log.board(args.move))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Display of the boards while playing, without printing the whole board after every block.
+
+A DiffRenderer remembers the rows it has printed and gives only the ones that changed, and a
+Display decides when to print: every some moves, every some milliseconds, or both. For instance,
+to watch a long game in a terminal, rewriting only the rows that change at most 20 times a second:
+    play_game(player, blocks, show=Display(interval=50, diff=True))
+"""
+
+import sys
+import time
+
+from gameboard import *
+from gameboard import _row_string
+
+
+class DiffRenderer:
+    """
+    Class that renders a board and then only the rows that changed since the last time
+    The rows are compared as integers, so finding the changed rows costs one comparison per row,
+    and only the rows that may have changed are compared if they are given.
+    """
+
+    def __init__(self):
+        self._rows = None
+
+
+    def full(self, board):
+        """
+        Method that returns the string of a board, like it is printed, and remembers its rows
+        """
+
+        self._rows = [board.row_bits(i) for i in range(board.get_shape().height)]
+        width = board.get_shape().width
+        return '\n'.join([_row_string(bits, width) for bits in reversed(self._rows)]) + '\n'
+
+
+    def changes(self, board, candidates = None):
+        """
+        Method that returns the rows that changed since the last time as a list of (row, string)
+        All the rows are returned the first time, or if the board has another shape.
+        Arguments:
+            board -> the board
+            candidates -> the rows that may have changed, all of them if not given
+        """
+
+        height, width = board.get_shape().height, board.get_shape().width
+        old = self._rows
+        if old is None or len(old) != height:
+            self._rows = [board.row_bits(i) for i in range(height)]
+            return [(i, _row_string(self._rows[i], width)) for i in range(height - 1, -1, -1)]
+
+        changed = []
+        for i in (range(height - 1, -1, -1) if candidates is None else sorted(candidates, reverse=True)):
+            bits = board.row_bits(i)
+            if bits != old[i]:
+                old[i] = bits
+                changed.append((i, _row_string(bits, width)))
+        return changed
+
+
+    def ansi(self, board, candidates = None):
+        """
+        Method that returns the text that rewrites, in a terminal, the rows that changed of the board printed before
+        The cursor must be at the line after the board, where it is left.
+        Arguments:
+            board -> the board
+            candidates -> the rows that may have changed, all of them if not given
+        """
+
+        if self._rows is None or len(self._rows) != board.get_shape().height:
+            return self.full(board)
+
+        out = []
+        for row, line in self.changes(board, candidates):
+            # the top row is printed first, so row i is i + 1 lines above the cursor
+            up = row + 1
+            out.append('\x1b[' + str(up) + 'F' + line + '\x1b[' + str(up) + 'E')
+        return ''.join(out)
+
+
+class Display:
+    """
+    Class that shows a board while a game is played, every some moves or milliseconds
+    It can be given to play_game as show.
+    """
+
+    def __init__(self, every = None, interval = None, diff = False, writer = None):
+        """
+        Initialization of a display.
+        Arguments:
+            every -> the board is shown each every moves, or each move if neither every nor interval are given
+            interval -> milliseconds between two times the board is shown, optional argument
+            diff -> if asserted, only the rows that changed are rewritten, with ANSI escape codes; False if not given
+            writer -> file where the board is written, the standard output if not given
+        """
+
+        self._every = 1 if every is None and interval is None else every
+        self._interval = None if interval is None else interval/1000
+        self._diff = diff
+        self._writer = writer
+        self._renderer = DiffRenderer()
+        self._moves = 0
+        self._last = None
+        self._pending = False
+        # rows changed by the moves since the board was last shown, None if they are not known
+        self._changed = set()
+
+
+    def update(self, board, force = False, placement = None):
+        """
+        Method to count a move, showing the board if it is its time
+        Arguments:
+            board -> the board after the move
+            force -> if asserted, the board is shown anyway and the move is not counted, False if not given
+            placement -> PlaceResult of the move, as given by MyPlayer.last_placement; if it is not given
+                         all the rows are compared when the board is shown
+        """
+
+        now = time.perf_counter()
+        if not force:
+            self._moves += 1
+            if placement is None or placement.columns or self._changed is None:
+                # clearing a column changes all the rows
+                self._changed = None
+            else:
+                row, height = placement.location.row, placement.shape.height
+                self._changed.update(range(row, row + height))
+                self._changed.update(placement.rows)
+            by_moves = self._every is not None and self._moves % self._every == 0
+            by_time = self._interval is not None and (self._last is None or now - self._last >= self._interval)
+            if not (by_moves or by_time):
+                self._pending = True
+                return
+
+        writer = self._writer or sys.stdout
+        if self._diff:
+            writer.write(self._renderer.ansi(board, self._changed))
+        else:
+            writer.write(self._renderer.full(board) + '\n')
+        writer.flush()
+        self._last = now
+        self._pending = False
+        self._changed = set()
+
+
+    def finish(self, board):
+        """
+        Method to show the board at the end of the game, if its last move was not shown
+        """
+
+        if self._pending:
+            self.update(board, force=True)
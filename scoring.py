@@ -0,0 +1,177 @@
+"""
+Vectorized version of the punctuation of the expert player.
+It punctuates all the locations of a board for a shape at once with NumPy arrays,
+doing the same operations in the same order than MyPlayer._punctuation, so the
+punctuations are exactly the same. NumPy is optional, if it is not installed
+HAVE_NUMPY is False and the player punctuates the locations one by one.
+"""
+
+from gameboard import *
+from bitboard import BitGameBoard
+from compactboard import CompactGameBoard
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# function called with the number of locations checked and punctuated by best_locations, or None
+# It is set by the profiler.
+candidates_hook = None
+
+
+def board_array(board):
+    """
+    Function that returns the squares of a board as a height*width NumPy array of booleans
+    Arguments:
+        board -> a GameBoard, a BitGameBoard or a CompactGameBoard
+    """
+
+    shape = board.get_shape()
+    if isinstance(board, CompactGameBoard):
+        # the rows are already little endian bytes
+        raw = np.frombuffer(board._bits, dtype=np.uint8).reshape(shape.height, board._stride)
+        return np.unpackbits(raw, axis=1, bitorder='little')[:, :shape.width].astype(bool)
+    if isinstance(board, BitGameBoard):
+        # each row is written as little endian bytes and unpacked into bits
+        nbytes = (shape.width + 7)//8
+        raw = b''.join(bits.to_bytes(nbytes, 'little') for bits in board._rows)
+        bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8).reshape(shape.height, nbytes), axis=1, bitorder='little')
+        return bits[:, :shape.width].astype(bool)
+    return np.array(board._board, dtype=bool)
+
+
+def punctuations(cells, row_counters, column_counters, checkShape, weights):
+    """
+    Function that punctuates all the locations of a board where a shape fits, valid or not
+    Returns a (height-shape.height+1)*(width-shape.width+1) array, the punctuation of
+    the location (r, c) is at [r, c]
+    Arguments:
+        cells -> array of booleans with the squares of the board, as given by board_array
+        row_counters, column_counters -> counters of the board
+        checkShape -> shape to be placed
+        weights -> the six weights of the punctuation, in the order of MyPlayer
+    """
+
+    suma_adjacent, suma_borde, petar, petar_voltant, casi_petar, resta_diag = weights
+    height, width = cells.shape
+    w, h = checkShape.width, checkShape.height
+    nr, nc = height - h + 1, width - w + 1
+
+    # board surrounded by the border, with the value each square adds to an adjacent location
+    adjacent = np.full((height + 2, width + 2), suma_borde)
+    adjacent[1:-1, 1:-1] = np.where(cells, suma_adjacent, 0.0)
+
+    # board surrounded by the border, with the squares that subtract to a diagonal location
+    diagonal = np.ones((height + 2, width + 2), dtype=bool)
+    diagonal[1:-1, 1:-1] = cells
+
+    punctuation = np.zeros((nr, nc))
+
+    # adjacent squares, in the same order than _punctuation
+    for i in range(w):
+        punctuation += adjacent[0:nr, 1+i:1+i+nc]
+        punctuation += adjacent[h+1:h+1+nr, 1+i:1+i+nc]
+    for i in range(h):
+        punctuation += adjacent[1+i:1+i+nr, 0:nc]
+        punctuation += adjacent[1+i:1+i+nr, w+1:w+1+nc]
+
+    # locations without anything adjacent are punctuated 0
+    alone = punctuation == 0
+
+    # diagonally adjacent squares
+    for corner in (diagonal[0:nr, 0:nc], diagonal[0:nr, w+1:w+1+nc],
+                   diagonal[h+1:h+1+nr, w+1:w+1+nc], diagonal[h+1:h+1+nr, 0:nc]):
+        punctuation = np.where(corner, punctuation - resta_diag, punctuation)
+
+    # rows and columns
+    rows = np.asarray(row_counters, dtype=np.int64)
+    columns = np.asarray(column_counters, dtype=np.int64)
+    punctuation = _add_lines(punctuation, rows, width - w, h, petar, petar_voltant, casi_petar, nr)
+    punctuation = _add_lines(punctuation.T, columns, height - h, w, petar, petar_voltant, casi_petar, nc).T
+
+    punctuation[alone] = 0
+    return punctuation
+
+
+def _add_lines(punctuation, counters, limit, size, petar, petar_voltant, casi_petar, n):
+    """
+    Auxiliar function that adds the terms of the rows (or the columns, if punctuation is transposed)
+    """
+
+    previous = np.concatenate(([0], counters[:-1]))
+    following = np.concatenate((counters[1:], [0]))
+    for i in range(size):
+        counter = counters[i:i+n]
+        position = np.arange(i, i + n)
+        fills = counter == limit
+
+        punctuation = punctuation + np.where(fills, counter*petar, counter*casi_petar)[:, None]
+        with_previous = (fills & (position > 0))[:, None]
+        punctuation = np.where(with_previous, punctuation + (previous[i:i+n]*petar_voltant)[:, None], punctuation)
+        # the same condition than _punctuation, with the size of the shape
+        with_following = (fills & (position < size - 1))[:, None]
+        punctuation = np.where(with_following, punctuation + (following[i:i+n]*petar_voltant)[:, None], punctuation)
+    return punctuation
+
+
+def best_locations(board, checkShape, weights, count, anchors = None):
+    """
+    Function that returns the best valid locations to place a shape, as a list of (punctuation, location)
+    They are sorted from the best, and the first one in order goes first if there is a tie.
+    Locations punctuated -1000000 or less are not considered, like in the expert player.
+    Arguments:
+        board -> a GameBoard, a BitGameBoard or a CompactGameBoard
+        checkShape -> shape to be placed
+        weights -> the six weights of the punctuation, in the order of MyPlayer
+        count -> maximum number of locations returned
+        anchors -> the valid locations, as found by the board; if not given they are found here
+    """
+
+    cells = board_array(board)
+    w, h = checkShape.width, checkShape.height
+    punctuation = punctuations(cells, board.row_counters(), board.column_counters(), checkShape, weights)
+    flat = punctuation.ravel()
+
+    if anchors is None:
+        # number of full squares of each location's rectangle, with a summed-area table
+        table = np.zeros((cells.shape[0] + 1, cells.shape[1] + 1), dtype=np.int64)
+        table[1:, 1:] = cells.cumsum(axis=0).cumsum(axis=1)
+        filled = table[h:, w:] - table[:-h, w:] - table[h:, :-w] + table[:-h, :-w]
+        empty = filled.ravel() == 0
+    else:
+        empty = np.zeros(flat.size, dtype=bool)
+        empty[[loc.row*punctuation.shape[1] + loc.column for loc in anchors]] = True
+
+    if candidates_hook is not None:
+        # all the locations are punctuated, and checked here if the board didn't find them
+        candidates_hook(flat.size if anchors is None else 0, flat.size)
+    if count == 1:
+        # argmax returns the first maximum in row-major order, without sorting
+        k = int(np.argmax(np.where(empty, flat, -np.inf)))
+        if not flat[k] > -1000000 or not empty[k]:
+            return []
+        return [(float(flat[k]), Location(*divmod(k, punctuation.shape[1])))]
+
+    valid = np.flatnonzero(empty & (flat > -1000000))
+
+    # greatest punctuation first, and then in row-major order, like the loops of the player
+    order = valid[np.lexsort((valid, -flat[valid]))][:count]
+    return [(float(flat[k]), Location(*divmod(int(k), punctuation.shape[1]))) for k in order]
+
+
+def best_location(board, checkShape, weights, anchors = None):
+    """
+    Function that returns the location where the expert player places a shape, or None
+    It is the valid location with the greatest punctuation, and the first one in order if there is a tie
+    Arguments:
+        board -> a GameBoard, a BitGameBoard or a CompactGameBoard
+        checkShape -> shape to be placed
+        weights -> the six weights of the punctuation, in the order of MyPlayer
+        anchors -> the valid locations, as found by the board; if not given they are found here
+    """
+
+    best = best_locations(board, checkShape, weights, 1, anchors)
+    return best[0][1] if best else None
@@ -0,0 +1,217 @@
+"""
+Asyncio server that hosts many independent games, each one with its own MyPlayer.
+
+The protocol is line-delimited text, one request and one response per line:
+    NEW <width> <height> [method]   ->  OK <session>
+    PLAY <session> <width> <height> ->  AT <row> <column>, after placing the block
+                                        NONE, if the block can not be placed (the game is over)
+    END <session>                   ->  OK
+    STATS                           ->  OK <sessions> <moves>
+Errors are answered with ERR <message>. A connection can use many sessions, and the
+sessions it didn't end are ended when it is closed.
+
+The boards are created and the moves computed in an executor, so the event loop keeps
+answering the other sessions meanwhile. The default pool of threads keeps the server
+responsive, but the moves are Python code that holds the GIL, so they don't run in
+parallel: to use more than one core, run a server process per core, each one on its
+own port or Unix socket, and spread the connections among them. For instance:
+    python server.py --port 7777
+    python server.py --unix /tmp/hard-tetris.sock
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import sys
+
+from gameboard import *
+from myplayer import MyPlayer
+
+
+class _Session:
+    """
+    Class of a game hosted by the server
+    """
+
+    __slots__ = ('player', 'lock')
+
+    def __init__(self, player):
+        self.player = player
+        self.lock = asyncio.Lock()
+
+
+class GameServer:
+    """
+    Class of the server, that keeps the sessions and answers the requests of the connections
+    """
+
+    def __init__(self, executor = None, max_sessions = 100000, max_squares = 1000000, **options):
+        """
+        Initialization of a server without sessions.
+        Arguments:
+            executor -> executor where the boards are created and the moves computed, a pool of threads if not given
+                        The threads share the GIL, so they only keep the event loop free, see the module
+            max_sessions -> maximum number of sessions at the same time, 100000 if not given
+            max_squares -> maximum number of squares of the board of a session, 1000000 if not given
+            options -> other arguments for the MyPlayer of the sessions
+        """
+
+        self._executor = executor or concurrent.futures.ThreadPoolExecutor()
+        self._max_sessions = max_sessions
+        self._max_squares = max_squares
+        self._options = options
+        self._sessions = {}
+        # sessions whose players are being created
+        self._creating = 0
+        self._ids = itertools.count(1)
+        self.moves = 0
+
+
+    def _play(self, player, block):
+        """
+        Auxiliar method that plays and places a block, returns its location or None
+        """
+
+        location = player.play(block)
+        if location is not None:
+            player.place_block(location, block)
+        return location
+
+
+    async def handle(self, line, owned = None):
+        """
+        Method that answers a request, given and returned as a line of text without the end of line
+        Arguments:
+            line -> the request
+            owned -> set of the sessions begun and not ended by the connection of the request, kept
+                     up to date by the method; optional argument
+        """
+
+        words = line.split()
+        if not words:
+            return "ERR empty request"
+        command = words[0].upper()
+
+        try:
+            if command == "NEW" and len(words) in (3, 4):
+                w, h = int(words[1]), int(words[2])
+                if w <= 0 or h <= 0 or w*h > self._max_squares:
+                    return "ERR the board must have between 1 and " + str(self._max_squares) + " squares"
+                # the sessions being created count, so that many NEW at once don't go over the maximum
+                if len(self._sessions) + self._creating >= self._max_sessions:
+                    return "ERR too many sessions"
+                method = words[3] if len(words) == 4 else "simple"
+                # big boards take long to be created
+                self._creating += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    create = functools.partial(MyPlayer, w, h, method, **self._options)
+                    player = await loop.run_in_executor(self._executor, create)
+                finally:
+                    self._creating -= 1
+                session = next(self._ids)
+                self._sessions[session] = _Session(player)
+                if owned is not None:
+                    owned.add(session)
+                return "OK " + str(session)
+
+            if command == "PLAY" and len(words) == 4:
+                session = self._sessions.get(int(words[1]))
+                if session is None:
+                    return "ERR unknown session"
+                block = Shape(int(words[2]), int(words[3]))
+                if not session.player.is_legal(block):
+                    return "ERR the shape is not legal"
+
+                # the moves of a session are done one after the other
+                async with session.lock:
+                    loop = asyncio.get_running_loop()
+                    location = await loop.run_in_executor(self._executor, self._play, session.player, block)
+                self.moves += 1
+                if location is None:
+                    return "NONE"
+                return "AT " + str(location.row) + " " + str(location.column)
+
+            if command == "END" and len(words) == 2:
+                if self._sessions.pop(int(words[1]), None) is None:
+                    return "ERR unknown session"
+                if owned is not None:
+                    owned.discard(int(words[1]))
+                return "OK"
+
+            if command == "STATS" and len(words) == 1:
+                return "OK " + str(len(self._sessions)) + " " + str(self.moves)
+
+        except Exception as ex:
+            return "ERR " + str(ex)
+
+        return "ERR unknown request"
+
+
+    async def serve_connection(self, reader, writer):
+        """
+        Method that answers all the requests of a connection, until it is closed
+        The sessions begun by the connection and not ended are ended when it is closed.
+        """
+
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle(line.decode(errors="replace"), owned)
+                writer.write(response.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session in owned:
+                self._sessions.pop(session, None)
+            writer.close()
+
+
+    async def start(self, host = "127.0.0.1", port = 7777, unix = None):
+        """
+        Method that begins listening on a TCP port, or on a Unix socket if unix is given
+        Returns the asyncio server
+        """
+
+        if unix is not None:
+            return await asyncio.start_unix_server(self.serve_connection, path=unix)
+        return await asyncio.start_server(self.serve_connection, host, port)
+
+
+async def _serve(args):
+    options = {"backend": args.backend, "cache": args.cache, "prune": args.prune, "free_space": args.free_space}
+    server = GameServer(concurrent.futures.ThreadPoolExecutor(args.workers), args.max_sessions, args.max_squares, **options)
+    listener = await server.start(args.host, args.port, args.unix)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Server of games")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="path of a Unix socket to listen on instead of TCP")
+    parser.add_argument("--workers", type=int, help="threads that create the boards and compute the moves")
+    parser.add_argument("--max-sessions", type=int, default=100000)
+    parser.add_argument("--max-squares", type=int, default=1000000, help="maximum number of squares of a board")
+    parser.add_argument("--backend", default="list", help="representation of the boards: list, bit or compact")
+    parser.add_argument("--cache", action="store_true", help="the boards keep the valid locations of the shapes played")
+    parser.add_argument("--prune", action="store_true", help="the expert players prune the locations")
+    parser.add_argument("--free-space", action="store_true", help="the boards keep their free space, for large boards")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
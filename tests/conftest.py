@@ -0,0 +1,46 @@
+import os
+import sys
+
+# the modules of the game are at the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from gameboard import *
+from myplayer import MyPlayer, EXPERT_WEIGHTS
+
+
+def _random_players(rng, variants, max_side = 12, rectangles = 40):
+    """
+    Function that returns expert players with the same random board and weights, one for each variant
+    The board has some random rectangles put, and its full lines are cleared half of the times. The
+    weights are EXPERT_WEIGHTS, or half of the times EXPERT_WEIGHTS scaled at random.
+    Arguments:
+        rng -> random generator
+        variants -> list of dictionaries with the other arguments of each MyPlayer
+        max_side -> maximum width and height of the board, 12 if not given
+        rectangles -> maximum number of rectangles tried to be put, 40 if not given
+    """
+
+    W, H = rng.randint(1, max_side), rng.randint(1, max_side)
+    weights = [w*rng.uniform(0.5, 2) for w in EXPERT_WEIGHTS] if rng.random() < 0.5 else None
+    players = [MyPlayer(W, H, "expert", weights=weights, **options) for options in variants]
+    for _ in range(rng.randint(0, rectangles)):
+        shape = Shape(rng.randint(1, W), rng.randint(1, H))
+        location = Location(rng.randint(0, H - shape.height), rng.randint(0, W - shape.width))
+        if players[0]._board.is_empty(location, shape):
+            for player in players:
+                player._board.put(location, shape)
+    if rng.random() < 0.5:
+        for player in players:
+            player._clear_full()
+    return players
+
+
+@pytest.fixture
+def random_players():
+    """
+    Fixture of the function that returns expert players with the same random board, see _random_players
+    """
+
+    return _random_players
@@ -0,0 +1,195 @@
+"""
+Tests that all the backends of the board give the same results for the same operations.
+"""
+
+import random
+
+import pytest
+
+from gameboard import *
+from bitboard import BitGameBoard
+from compactboard import CompactGameBoard
+
+
+BACKENDS = [
+    GameBoard,
+    BitGameBoard,
+    CompactGameBoard,
+    lambda shape: GameBoard(shape, index=True),
+    lambda shape: BitGameBoard(shape, free_space=True),
+    lambda shape: CompactGameBoard(shape, index=True, free_space=True),
+]
+
+
+def state(board):
+    """
+    Function that returns everything that can be seen of a board
+    """
+
+    shape = board.get_shape()
+    cells = [[board.is_full(Location(i, j)) for j in range(shape.width)] for i in range(shape.height)]
+    return (cells, list(board.row_counters()), list(board.column_counters()),
+            board.full_rows(), board.full_columns(), str(board), repr(board))
+
+
+def random_operation(rng, shape):
+    """
+    Function that returns a random operation as (name, location, shape)
+    """
+
+    w, h = rng.randint(1, shape.width), rng.randint(1, shape.height)
+    location = Location(rng.randint(0, shape.height - h), rng.randint(0, shape.width - w))
+    return rng.choice(["put", "put", "put", "remove", "clear_rows", "clear_columns"]), location, Shape(w, h)
+
+
+def apply(board, operation):
+    """
+    Function that applies an operation to a board, returning what it returns or the message of its exception
+    """
+
+    name, location, shape = operation
+    try:
+        if name == "put":
+            board.put(location, shape)
+        elif name == "remove":
+            board.remove(location, shape)
+        elif name == "clear_rows":
+            rows = board.full_rows() or [location.row]
+            board.clear_rows(rows)
+            return rows
+        else:
+            columns = board.full_columns() or [location.column]
+            board.clear_columns(columns)
+            return columns
+    except Exception as ex:
+        return str(ex)
+    return None
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_operations(seed):
+    rng = random.Random(seed)
+    shape = Shape(rng.randint(1, 12), rng.randint(1, 12))
+    boards = [backend(shape) for backend in BACKENDS]
+
+    for step in range(80):
+        operation = random_operation(rng, shape)
+        results = [apply(board, operation) for board in boards]
+        assert all(result == results[0] for result in results), (step, operation, results)
+
+        expected = state(boards[0])
+        for board in boards[1:]:
+            assert state(board) == expected, (step, operation, type(board).__name__)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_valid_locations(seed):
+    rng = random.Random(seed)
+    shape = Shape(rng.randint(1, 20), rng.randint(1, 10))
+    boards = [backend(shape) for backend in BACKENDS]
+
+    for step in range(60):
+        operation = random_operation(rng, shape)
+        for board in boards:
+            apply(board, operation)
+
+        w, h = rng.randint(1, shape.width), rng.randint(1, shape.height)
+        expected = [Location(i, j) for i in range(shape.height - h + 1) for j in range(shape.width - w + 1)
+                    if boards[0].is_empty(Location(i, j), Shape(w, h))]
+        for board in boards:
+            assert board.fitting_locations(Shape(w, h)) == expected
+            assert sorted(board.valid_locations(Shape(w, h))) == expected
+            assert board.first_location(Shape(w, h)) == (expected[0] if expected else None)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_valid_locations_checkpoints(seed):
+    rng = random.Random(seed)
+    shape = Shape(rng.randint(1, 12), rng.randint(1, 12))
+    shapes = [Shape(rng.randint(1, shape.width), rng.randint(1, shape.height)) for _ in range(3)]
+    boards = [backend(shape) for backend in BACKENDS]
+
+    for step in range(20):
+        for board in boards:
+            for checkShape in shapes:
+                board.valid_locations(checkShape)
+
+        # some changes are undone and the rest kept
+        operations = [random_operation(rng, shape) for _ in range(6)]
+        for board in boards:
+            mark = board.checkpoint()
+            for operation in operations[:3]:
+                apply(board, operation)
+            child = board.checkpoint()
+            for operation in operations[3:]:
+                apply(board, operation)
+            board.rollback(child)
+            board.commit(child)
+            board.commit(mark)
+
+        for checkShape in shapes:
+            expected = boards[0].fitting_locations(checkShape)
+            for board in boards:
+                assert sorted(board.valid_locations(checkShape)) == expected, (step, type(board).__name__)
+
+
+def full_state(board):
+    """
+    Function that returns the state of a board with its hash and what its indexes find
+    """
+
+    shape = board.get_shape()
+    counts = [board.count_filled(Location(i, j), Shape(shape.width - j, shape.height - i))
+              for i in range(shape.height) for j in range(shape.width)]
+    return state(board), board.board_hash(), counts, board.fitting_locations(Shape(1, 1))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(10))
+def test_rollback(seed, backend):
+    rng = random.Random(seed)
+    shape = Shape(rng.randint(1, 12), rng.randint(1, 12))
+    board = backend(shape)
+    for _ in range(20):
+        apply(board, random_operation(rng, shape))
+
+    for step in range(10):
+        before = full_state(board)
+        mark = board.checkpoint()
+        for _ in range(rng.randint(0, 8)):
+            apply(board, random_operation(rng, shape))
+
+        # a nested checkpoint, kept or undone
+        child = board.checkpoint()
+        for _ in range(rng.randint(0, 8)):
+            apply(board, random_operation(rng, shape))
+        if rng.random() < 0.5:
+            board.rollback(child)
+        board.commit(child)
+
+        board.rollback(mark)
+        board.commit(mark)
+        assert full_state(board) == before, step
+
+        # changes after the checkpoints are finished are kept
+        apply(board, random_operation(rng, shape))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(10))
+def test_snapshot(seed, backend):
+    rng = random.Random(seed)
+    shape = Shape(rng.randint(1, 12), rng.randint(1, 12))
+    board = backend(shape)
+
+    snapshots = []
+    for step in range(30):
+        apply(board, random_operation(rng, shape))
+        if rng.random() < 0.3:
+            snapshots.append((board.snapshot(), full_state(board)))
+
+    # the same snapshot can be restored many times, in any order
+    for snapshot, expected in rng.sample(snapshots, len(snapshots))*2:
+        board.restore(snapshot)
+        assert full_state(board) == expected
+        apply(board, random_operation(rng, shape))
@@ -0,0 +1,103 @@
+"""
+Benchmarks of the board operations and of the players, run with pytest-benchmark:
+    python -m pytest tests/test_benchmark.py --benchmark-only
+They are skipped if pytest-benchmark is not installed.
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from gameboard import *
+from myplayer import MyPlayer, play_game
+from blocks import random_blocks
+from benchmark import BOARDS
+
+SIZE = 20
+
+pytestmark = pytest.mark.benchmark(max_time=0.2)
+
+
+def half_full(name, seed = 0):
+    """
+    Function that returns a board of BOARDS with about half of its squares full
+    """
+
+    board_class, options = BOARDS[name]
+    board = board_class(Shape(SIZE, SIZE), **options)
+    rng = random.Random(seed)
+    for _ in range(SIZE*SIZE//2):
+        location = Location(rng.randrange(SIZE), rng.randrange(SIZE))
+        if board.is_empty(location):
+            board.put(location)
+    return board
+
+
+def empty_rectangle(board, shape):
+    """
+    Function that returns the first location where a rectangle of a shape can be put
+    """
+
+    location = board.first_location(shape)
+    assert location is not None
+    return location
+
+
+@pytest.mark.parametrize("name", list(BOARDS))
+def test_is_empty(benchmark, name):
+    board = half_full(name)
+    shape = Shape(3, 3)
+    locations = [Location(i, j) for i in range(SIZE - 2) for j in range(SIZE - 2)]
+
+    def check():
+        return sum(board.is_empty(location, shape) for location in locations)
+
+    assert benchmark(check) == len(board.fitting_locations(shape))
+
+
+@pytest.mark.parametrize("name", list(BOARDS))
+def test_put_remove(benchmark, name):
+    board = half_full(name)
+    shape = Shape(1, 2)
+    location = empty_rectangle(board, shape)
+
+    def put_remove():
+        board.put(location, shape)
+        board.remove(location, shape)
+
+    benchmark(put_remove)
+    assert board.is_empty(location, shape)
+
+
+@pytest.mark.parametrize("name", list(BOARDS))
+def test_place_and_clear(benchmark, name):
+    board = half_full(name)
+    shape = Shape(1, 1)
+    location = empty_rectangle(board, shape)
+
+    def place_and_undo():
+        mark = board.checkpoint()
+        board.place_and_clear(location, shape)
+        board.rollback(mark)
+        board.commit(mark)
+
+    benchmark(place_and_undo)
+    assert board.is_empty(location, shape)
+
+
+@pytest.mark.parametrize("name", list(BOARDS))
+def test_fitting_locations(benchmark, name):
+    board = half_full(name)
+    assert benchmark(board.fitting_locations, Shape(2, 2)) == half_full("list").fitting_locations(Shape(2, 2))
+
+
+@pytest.mark.parametrize("method", ["simple", "expert"])
+def test_game(benchmark, method):
+    blocks = random_blocks(Shape(SIZE, SIZE), 50, 0)
+
+    def game():
+        return play_game(MyPlayer(SIZE, SIZE, method), blocks, show=False)
+
+    assert benchmark(game) > 0
@@ -0,0 +1,139 @@
+"""
+Tests of the sources of blocks: the binary files and the text files read in chunks.
+"""
+
+import io
+import os
+import types
+
+import pytest
+
+from gameboard import *
+from blocks import (random_blocks, iter_blocks, write_binary, load_binary, convert_text, is_binary,
+                    open_blocks, ShapeView)
+
+SHAPES = random_blocks(Shape(50, 50), 1000, 0, max_size=50) + [Shape(65535, 1), Shape(1, 65535)]
+
+
+def write_text(path, shapes):
+    with open(path, "w") as writer:
+        writer.write(" ".join(str(shape.width) + " " + str(shape.height) for shape in shapes) + "\n")
+
+
+def test_binary_round_trip(tmp_path):
+    text, binary = str(tmp_path / "blocks.txt"), str(tmp_path / "blocks.bin")
+    write_text(text, SHAPES)
+    assert convert_text(text, binary) == len(SHAPES)
+    assert is_binary(binary) and not is_binary(text)
+
+    with load_binary(binary) as view:
+        assert len(view) == len(SHAPES)
+        assert list(view) == SHAPES
+        assert [view[i] for i in range(len(SHAPES))] == SHAPES
+
+
+def test_indexing(tmp_path):
+    binary = str(tmp_path / "blocks.bin")
+    assert write_binary(SHAPES, binary) == len(SHAPES)
+    with load_binary(binary) as view:
+        assert view[-1] == SHAPES[-1]
+        assert view[-len(SHAPES)] == SHAPES[0]
+        for index in (len(SHAPES), -len(SHAPES) - 1):
+            with pytest.raises(IndexError):
+                view[index]
+        for part in (slice(10, 20), slice(None, None, -3), slice(-5, None), slice(5, 2), slice(None, None, 7)):
+            assert view[part] == SHAPES[part]
+
+
+def test_empty_binary(tmp_path):
+    binary = str(tmp_path / "blocks.bin")
+    assert write_binary([], binary) == 0
+    with load_binary(binary) as view:
+        assert len(view) == 0 and list(view) == [] and view[:] == []
+
+
+def test_wrong_size(tmp_path):
+    binary = str(tmp_path / "blocks.bin")
+    write_binary(SHAPES[:10], binary)
+    with open(binary, "ab") as writer:
+        writer.write(b"\x01\x00")
+    with pytest.raises(AssertionError, match="Wrong number of items"):
+        load_binary(binary)
+
+    with open(binary, "wb") as writer:
+        writer.write(b"HTB")
+    with pytest.raises(AssertionError, match="not a binary file"):
+        load_binary(binary)
+
+
+def test_illegal_shape(tmp_path):
+    with pytest.raises(AssertionError):
+        write_binary([Shape(0, 3)], str(tmp_path / "blocks.bin"))
+
+
+def test_open_blocks(tmp_path):
+    text, binary = str(tmp_path / "blocks.txt"), str(tmp_path / "blocks.bin")
+    write_text(text, SHAPES)
+    write_binary(SHAPES, binary)
+
+    shapes = open_blocks(binary)
+    assert isinstance(shapes, ShapeView)
+    assert list(shapes) == SHAPES
+    shapes.close()
+
+    shapes = open_blocks(text, chunk_size=5)
+    assert isinstance(shapes, types.GeneratorType)
+    assert list(shapes) == SHAPES
+
+
+TEXT = "  3 4\n\n12\t 1 5  5\r\n7 100\t\t2   2 \n 10 1"
+TEXT_SHAPES = [Shape(3, 4), Shape(12, 1), Shape(5, 5), Shape(7, 100), Shape(2, 2), Shape(10, 1)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_chunks(tmp_path, chunk_size):
+    path = str(tmp_path / "blocks.txt")
+    with open(path, "w", newline="") as writer:
+        writer.write(TEXT)
+    assert list(iter_blocks(path, chunk_size=chunk_size)) == TEXT_SHAPES
+    assert list(iter_blocks(path, use_mmap=True)) == TEXT_SHAPES
+
+    # open files, in text and binary mode
+    with open(path) as reader:
+        assert list(iter_blocks(reader, chunk_size=chunk_size)) == TEXT_SHAPES
+    with open(path, "rb") as reader:
+        assert list(iter_blocks(reader, chunk_size=chunk_size)) == TEXT_SHAPES
+
+
+def test_stream(tmp_path):
+    path = str(tmp_path / "blocks.txt")
+    with open(path, "w") as writer:
+        writer.write(TEXT)
+    assert list(iter_blocks(io.StringIO(TEXT), chunk_size=2)) == TEXT_SHAPES
+    assert list(iter_blocks(io.BytesIO(TEXT.encode()), chunk_size=3)) == TEXT_SHAPES
+
+    # a file opened from a descriptor has an integer as name
+    with open(os.open(path, os.O_RDONLY)) as reader:
+        assert list(iter_blocks(reader)) == TEXT_SHAPES
+    with open(os.open(path, os.O_RDONLY)) as reader:
+        reader.read(3)
+        with pytest.raises(AssertionError, match="Wrong number of items in the stream"):
+            list(iter_blocks(reader))
+
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / "blocks.txt")
+    open(path, "w").close()
+    assert list(iter_blocks(path, use_mmap=True)) == []
+    assert list(iter_blocks(path)) == []
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_wrong_text(tmp_path, use_mmap):
+    path = str(tmp_path / "blocks.txt")
+    for text, message in [("3 4 5", "Wrong number of items"), ("3 4 x 5", "not an integer"),
+                          ("3 -4", "not an integer"), ("3 0", "Illegal size")]:
+        with open(path, "w") as writer:
+            writer.write(text)
+        with pytest.raises(AssertionError, match=message):
+            list(iter_blocks(path, chunk_size=2, use_mmap=use_mmap))
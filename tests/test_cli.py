@@ -0,0 +1,39 @@
+"""
+Tests of the command line that checks the time to import the modules.
+"""
+
+import argparse
+
+from cli import HEAVY_MODULES, import_time, check_imports
+
+
+def test_import_time():
+    micros, imported = import_time("gameboard", runs=1)
+    assert micros > 0
+    assert "gameboard" in imported
+
+
+def test_import_time_already_imported():
+    # the interpreter imports os when it starts
+    micros, imported = import_time("os", runs=1)
+    assert micros is None
+
+
+# milliseconds that the main modules may take to be imported, they take about 20 ms without bytecode
+BUDGET = 300
+
+
+def test_check_imports(capsys):
+    args = argparse.Namespace(modules=["cli", "gameboard", "myplayer", "blocks", "os"], budget=BUDGET, forbid=HEAVY_MODULES)
+    assert check_imports(args) == 0
+    assert "os" in capsys.readouterr().out
+
+
+def test_budget(capsys):
+    assert check_imports(argparse.Namespace(modules=["myplayer"], budget=0.001, forbid=[])) == 1
+    assert "over the budget" in capsys.readouterr().out
+
+
+def test_check_imports_fails():
+    assert check_imports(argparse.Namespace(modules=["myplayer"], budget=BUDGET, forbid=["gameboard"])) == 1
+    assert check_imports(argparse.Namespace(modules=["no_such_module"], budget=BUDGET, forbid=[])) == 1
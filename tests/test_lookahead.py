@@ -0,0 +1,95 @@
+"""
+Tests of the lookahead player, that searches over the next blocks undoing its tries with the journal.
+"""
+
+import random
+
+import pytest
+
+from gameboard import *
+from myplayer import MyPlayer, play_game
+
+
+def random_shape(rng, W, H):
+    return Shape(rng.randint(1, min(W, 4)), rng.randint(1, min(H, 4)))
+
+
+def board_state(board):
+    """
+    Function that returns what a search must leave as it was in a board
+    """
+
+    return (str(board), list(board.row_counters()), list(board.column_counters()), board.board_hash(),
+            board._journal, board._checkpoints)
+
+
+@pytest.mark.parametrize("cache", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_board_unchanged(seed, cache):
+    rng = random.Random(seed)
+    W, H = rng.randint(4, 10), rng.randint(4, 10)
+    player = MyPlayer(W, H, "lookahead", cache=cache, vectorized=False)
+    board = player.get_board()
+
+    for _ in range(40):
+        shape = random_shape(rng, W, H)
+        upcoming = tuple(random_shape(rng, W, H) for _ in range(3))
+        before = board_state(board)
+        location = player.play(shape, upcoming)
+        assert board_state(board) == before
+        if cache:
+            # the cached locations are still right
+            assert sorted(board.valid_locations(shape)) == board.fitting_locations(shape)
+        if location is None:
+            break
+        player.place_block(location, shape)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_time(seed):
+    rng = random.Random(seed)
+    W, H = rng.randint(4, 10), rng.randint(4, 10)
+    hurried, expert = MyPlayer(W, H, "lookahead", time_budget=0), MyPlayer(W, H, "expert")
+
+    for _ in range(60):
+        shape = random_shape(rng, W, H)
+        location = expert.play(shape)
+        assert hurried.play(shape, tuple(random_shape(rng, W, H) for _ in range(3))) == location
+        if location is None:
+            break
+        for player in (hurried, expert):
+            player.place_block(location, shape)
+
+
+class Watcher:
+    """
+    Class of a player that remembers the upcoming blocks it is given and plays like a simple player
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.player = MyPlayer(100, 100)
+        self.upcoming = []
+
+    def lookahead(self):
+        return self.window
+
+    def is_legal(self, shape):
+        return self.player.is_legal(shape)
+
+    def play(self, shape, upcoming = ()):
+        self.upcoming.append((shape, tuple(upcoming)))
+        return self.player.play(shape)
+
+    def place_block(self, location, shape):
+        self.player.place_block(location, shape)
+
+
+@pytest.mark.parametrize("window", [1, 3, 7])
+def test_play_game_upcoming(window):
+    blocks = [Shape(1, k % 5 + 1) for k in range(20)]
+    watcher = Watcher(window)
+    assert play_game(watcher, iter(blocks), show=False) == len(blocks)
+
+    # each block is given the next ones, fewer at the end of the blocks
+    assert watcher.upcoming == [(block, tuple(blocks[k + 1:k + 1 + window])) for k, block in enumerate(blocks)]
@@ -0,0 +1,44 @@
+"""
+Tests that the expert player finds the same location pruning the locations than punctuating all of them.
+"""
+
+import random
+
+import pytest
+
+from gameboard import *
+from myplayer import MyPlayer
+
+
+@pytest.mark.parametrize("options", [{}, {"backend": "bit"}, {"free_space": True}])
+@pytest.mark.parametrize("seed", range(10))
+def test_best_pruned(seed, options, random_players):
+    rng = random.Random(seed)
+    for _ in range(20):
+        variants = [dict(options, vectorized=False, prune=prune) for prune in (True, False)]
+        pruned, exhaustive = random_players(rng, variants, max_side=15, rectangles=50)
+        W, H = pruned._board.get_shape().width, pruned._board.get_shape().height
+        shape = Shape(rng.randint(1, W), rng.randint(1, H))
+
+        expected = exhaustive.play(shape)
+        best = pruned._best_pruned(shape)
+        if expected is None:
+            assert best is None
+        else:
+            assert best == (exhaustive._punctuation(expected, shape), expected)
+        assert pruned.play(shape) == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_games(seed):
+    rng = random.Random(seed)
+    W, H = rng.randint(6, 15), rng.randint(6, 15)
+    pruned, exhaustive = (MyPlayer(W, H, "expert", vectorized=False, prune=prune) for prune in (True, False))
+    for _ in range(150):
+        shape = Shape(rng.randint(1, min(W, 4)), rng.randint(1, min(H, 4)))
+        location = exhaustive.play(shape)
+        assert pruned.play(shape) == location
+        if location is None:
+            break
+        for player in (pruned, exhaustive):
+            player.place_block(location, shape)
@@ -0,0 +1,81 @@
+"""
+Tests of the logs of the games: recording them while playing and replaying them.
+"""
+
+import os
+
+import pytest
+
+from gameboard import *
+from myplayer import MyPlayer, play_game
+from blocks import random_blocks
+from recorder import GameRecorder, GameLog, read_moves
+
+
+class Watcher:
+    """
+    Class given to play_game as show, that keeps a copy of the board after each move
+    """
+
+    def __init__(self):
+        self.boards = []
+
+    def update(self, board, force = False, placement = None):
+        self.boards.append(str(board))
+
+    def finish(self, board):
+        pass
+
+
+def record_game(path, method = "expert", size = 10, n_blocks = 150):
+    """
+    Function that plays a game recording it, and returns the boards after each move, the first one empty
+    """
+
+    player = MyPlayer(size, size, method)
+    watcher = Watcher()
+    with GameRecorder(path, Shape(size, size)) as recorder:
+        placed = play_game(player, random_blocks(Shape(size, size), n_blocks, 0), show=watcher, recorder=recorder)
+    assert len(watcher.boards) == placed + 1
+    return watcher.boards
+
+
+@pytest.mark.parametrize("method", ["simple", "expert"])
+def test_round_trip(tmp_path, method):
+    path = str(tmp_path / "game.htgm")
+    boards = record_game(path, method)
+    log = GameLog(path, keyframe_interval=4)
+    assert log.placed() == len(boards) - 1
+    assert len(log) > 8
+
+    # forwards, backwards and jumping across the keyframes
+    n = len(boards) - 1
+    for move in list(range(0, n + 1, 7)) + list(range(n, -1, -5)) + [n, 0, n//2, min(n, 9), max(0, n - 1)]:
+        assert str(log.board(move)) == boards[move], move
+    log.verify()
+
+
+def test_torn_record(tmp_path):
+    path = str(tmp_path / "game.htgm")
+    boards = record_game(path)
+    shape, moves = read_moves(path)
+    size = os.path.getsize(path)
+
+    # the game is interrupted while writing a move
+    with open(path, "ab") as writer:
+        writer.write(b"\x01\x00\x02")
+    assert read_moves(path) == (shape, moves)
+    assert str(GameLog(path).board()) == boards[-1]
+
+    # appending overwrites the torn move
+    with GameRecorder(path, shape, append=True) as recorder:
+        recorder.record(Shape(1, 1), None)
+    assert os.path.getsize(path) == size + 16
+    assert read_moves(path)[1] == moves + [(Shape(1, 1), None, [], [], None)]
+
+
+def test_append_other_board(tmp_path):
+    path = str(tmp_path / "game.htgm")
+    record_game(path)
+    with pytest.raises(Exception):
+        GameRecorder(path, Shape(9, 8), append=True)
@@ -0,0 +1,67 @@
+"""
+Tests that the vectorized punctuation of scoring gives exactly the punctuations of the expert player.
+They are skipped if NumPy is not installed.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gameboard import *
+from myplayer import MyPlayer
+import scoring
+
+
+@pytest.mark.parametrize("backend", ["list", "bit", "compact"])
+@pytest.mark.parametrize("seed", range(10))
+def test_punctuations(seed, backend, random_players):
+    rng = random.Random(seed)
+    for _ in range(10):
+        player, = random_players(rng, [{"backend": backend}])
+        board = player._board
+        W, H = board.get_shape().width, board.get_shape().height
+        shape = Shape(rng.randint(1, W), rng.randint(1, H))
+
+        punctuation = scoring.punctuations(scoring.board_array(board), board.row_counters(),
+                                           board.column_counters(), shape, player._weights)
+        for location in board.fitting_locations(shape):
+            assert punctuation[location.row, location.column] == player._punctuation(location, shape)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_best_location(seed, random_players):
+    rng = random.Random(seed)
+    for _ in range(10):
+        player, = random_players(rng, [{}])
+        W, H = player._board.get_shape().width, player._board.get_shape().height
+        shape = Shape(rng.randint(1, W), rng.randint(1, H))
+
+        # the same player, punctuating the locations one by one
+        player._vectorized = False
+        expected = player.play(shape)
+        assert scoring.best_location(player._board, shape, player._weights) == expected
+
+
+@pytest.mark.parametrize("options, method", [({"free_space": True}, "fitting_locations"),
+                                             ({"cache": True}, "valid_locations")])
+def test_board_locations(options, method):
+    from profiler import Profiler
+
+    rng = random.Random(0)
+    blocks = [Shape(rng.randint(1, 4), rng.randint(1, 4)) for _ in range(60)]
+    players = [MyPlayer(15, 15, "expert", vectorized=vectorized, **options) for vectorized in (True, False)]
+    profiler = Profiler()
+    profiler.instrument_player(players[0])
+
+    # the vectorized player takes the valid locations from the board, and plays the same
+    for block in blocks:
+        location = players[1].play(block)
+        assert players[0].play(block) == location
+        if location is None:
+            break
+        for player in players:
+            player.place_block(location, block)
+    profiler.release_player(players[0])
+    assert profiler.calls["GameBoard." + method] > 0
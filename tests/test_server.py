@@ -0,0 +1,32 @@
+"""
+Tests of the requests of the server of games, without opening connections.
+"""
+
+import asyncio
+
+from server import GameServer
+
+
+def test_max_sessions():
+    async def run():
+        server = GameServer(max_sessions=3, backend="bit")
+        responses = await asyncio.gather(*[server.handle("NEW 200 200") for _ in range(8)])
+        return server, responses
+
+    # the sessions being created count, even if the boards are not created yet
+    server, responses = asyncio.run(run())
+    assert sorted(responses) == ["ERR too many sessions"]*5 + ["OK 1", "OK 2", "OK 3"]
+    assert len(server._sessions) == 3
+
+
+def test_sessions_of_a_connection():
+    async def run():
+        server = GameServer(max_squares=400)
+        owned = set()
+        responses = [await server.handle(line, owned) for line in
+                     ["NEW 10 10", "NEW 10 10 expert", "NEW 30 30", "PLAY 1 2 2", "END 1", "STATS"]]
+        return responses, owned
+
+    responses, owned = asyncio.run(run())
+    assert responses == ["OK 1", "OK 2", "ERR the board must have between 1 and 400 squares", "AT 0 0", "OK", "OK 1 1"]
+    assert owned == {2}
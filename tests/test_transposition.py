@@ -0,0 +1,108 @@
+"""
+Tests of the hash of the boards and of the transposition table of the expert player.
+"""
+
+import random
+
+import pytest
+
+import gameboard
+from gameboard import *
+from myplayer import MyPlayer
+from transposition import TranspositionTable
+
+from test_backends import BACKENDS, random_operation, apply
+
+
+def recomputed_hash(board):
+    """
+    Function that returns the hash of a new board with the same full squares, computed from all of them
+    """
+
+    shape = board.get_shape()
+    fresh = GameBoard(shape)
+    for i in range(shape.height):
+        for j in range(shape.width):
+            if board.is_full(Location(i, j)):
+                fresh.put(Location(i, j))
+    return fresh.board_hash()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_hash(seed, backend):
+    rng = random.Random(seed)
+    shape = Shape(rng.randint(1, 12), rng.randint(1, 12))
+    board = backend(shape)
+    board.board_hash()
+
+    for step in range(40):
+        apply(board, random_operation(rng, shape))
+        if rng.random() < 0.2:
+            mark = board.checkpoint()
+            for _ in range(rng.randint(1, 5)):
+                apply(board, random_operation(rng, shape))
+            board.rollback(mark)
+            board.commit(mark)
+        assert board.board_hash() == recomputed_hash(board), step
+
+
+def test_zobrist_keys_bounded(monkeypatch):
+    monkeypatch.setattr(gameboard, "ZOBRIST_MAX_BYTES", 8*100)
+    hashes = {}
+    for size in range(5, 12):
+        board = GameBoard(Shape(size, size))
+        board.put(Location(1, 2), Shape(2, 2))
+        hashes[size] = board.board_hash()
+        assert gameboard._zobrist_bytes <= 8*100 or len(gameboard._zobrist_keys) == 1
+
+    # the keys forgotten are made again the same
+    for size, value in hashes.items():
+        board = GameBoard(Shape(size, size))
+        board.put(Location(1, 2), Shape(2, 2))
+        assert board.board_hash() == value
+
+
+def test_table_counters():
+    table = TranspositionTable(max_bytes=2000)
+    assert table.get((1, 1, 1)) is None
+    for k in range(100):
+        table.put((k, 1, 1), (float(k), Location(0, k)))
+    stats = table.stats()
+
+    assert 0 < len(table) < 100
+    assert stats["bytes"] <= 2000
+    assert stats["evictions"] == 100 - len(table)
+    # the last ones are kept, the first ones forgotten
+    assert table.get((99, 1, 1)) == (99.0, Location(0, 99))
+    assert table.get((0, 1, 1)) is None
+    assert (table.hits, table.misses) == (1, 2)
+
+    # a key got is the last one forgotten
+    kept = [k for k in range(100) if (k, 1, 1) in table._entries]
+    table.get((kept[0], 1, 1))
+    table.put((100, 1, 1), (100.0, Location(0, 100)))
+    assert (kept[0], 1, 1) in table._entries
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_player_table(seed, vectorized):
+    rng = random.Random(seed)
+    W, H = rng.randint(4, 10), rng.randint(4, 10)
+    table = TranspositionTable()
+
+    # the same games twice, so the second time the decisions are in the table
+    for game in (seed, seed, seed + 1):
+        blocks = random.Random(game)
+        plain = MyPlayer(W, H, "expert", vectorized=vectorized)
+        cached = MyPlayer(W, H, "expert", vectorized=vectorized, table=table)
+        for _ in range(60):
+            shape = Shape(blocks.randint(1, min(W, 4)), blocks.randint(1, min(H, 4)))
+            location = plain.play(shape)
+            assert cached.play(shape) == location
+            if location is None:
+                break
+            for player in (plain, cached):
+                player.place_block(location, shape)
+    assert table.hits > 0
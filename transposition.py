@@ -0,0 +1,108 @@
+"""
+Transposition table: a bounded cache of the decisions of a player for a board and a shape.
+"""
+
+import collections
+import sys
+
+
+class TranspositionTable:
+    """
+    Class of a cache that maps (board hash, shape width, shape height) to the best (punctuation, location).
+    When its estimated size goes over max_bytes, the least recently used entries are forgotten.
+    It keeps counters of hits, misses and evictions.
+    A table must only be shared by players with the same board shape and the same weights.
+    """
+
+    def __init__(self, max_bytes = 16*1024*1024):
+        """
+        Initialization of an empty table.
+        Arguments:
+            max_bytes -> maximum estimated memory of the entries, 16 MiB if not given
+        """
+
+        if max_bytes <= 0:
+            raise Exception("The memory of the table must be positive")
+
+        self._max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def get(self, key):
+        """
+        Method that returns the value of a key, or None if it is not in the table
+        """
+
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+
+    def put(self, key, value):
+        """
+        Method to store the value of a key, forgetting the least recently used entries if needed
+        """
+
+        if key in self._entries:
+            self._bytes -= _entry_bytes(key, self._entries.pop(key))
+        self._entries[key] = value
+        self._bytes += _entry_bytes(key, value)
+
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            old_key, old_value = self._entries.popitem(last=False)
+            self._bytes -= _entry_bytes(old_key, old_value)
+            self.evictions += 1
+
+
+    def clear(self):
+        """
+        Method to forget all entries, the counters are kept
+        """
+
+        self._entries.clear()
+        self._bytes = 0
+
+
+    def stats(self):
+        """
+        Method that returns the counters and the size of the table as a dictionary
+        """
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits/lookups if lookups else 0.0,
+        }
+
+
+# memory of a slot of the dictionary, besides its key and value
+_SLOT_BYTES = 100
+
+def _entry_bytes(key, value):
+    """
+    Auxiliar function that estimates the memory of an entry
+    """
+
+    size = _SLOT_BYTES + sys.getsizeof(key) + sys.getsizeof(value)
+    for item in key:
+        size += sys.getsizeof(item)
+    for item in value:
+        size += sys.getsizeof(item)
+    return size
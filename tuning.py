@@ -0,0 +1,172 @@
+"""
+Tuning of the weights of the punctuation of the expert player.
+
+It is a cross-entropy search: each generation samples candidate weights from a
+normal distribution, plays the same random games with all of them (common random
+numbers, so the differences come from the weights and not from the blocks), and
+moves the distribution to the best candidates. The best weights found so far are played
+again in the games of every generation, so they are only compared with candidates that
+played the same games. The games are played in parallel
+with batch.run_batch. After every generation the state is saved in a checkpoint,
+so a stopped search can be resumed, for instance:
+    python tuning.py --boards 10x10 15x12 --generations 20 --checkpoint tuning.json --output weights.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+from gameboard import *
+from myplayer import EXPERT_WEIGHTS
+from batch import Job, run_batch, _board_shape
+
+
+def evaluate(candidates, boards, games, n_blocks, seed, workers = None, serial = False):
+    """
+    Function that returns the score of each candidate: the average number of blocks placed
+    The games of all candidates are the same, with seeds seed, seed + 1, ..., seed + games - 1
+    Arguments:
+        candidates -> list of lists of six weights
+        boards -> list of shapes of the boards
+        games -> number of random games of each board
+        n_blocks -> number of blocks of each game
+        seed -> first seed of the games
+        workers, serial -> as in run_batch
+    """
+
+    jobs = []
+    for k, weights in enumerate(candidates):
+        for board in boards:
+            for game in range(games):
+                jobs.append(Job(k, board.width, board.height, "expert", None, seed + game, n_blocks, {"weights": list(weights)}))
+
+    totals = [0]*len(candidates)
+    for result in run_batch(jobs, workers, serial=serial):
+        totals[result.id] += result.placed
+    return [total/(len(boards)*games) for total in totals]
+
+
+def _new_state(mean, seed):
+    """
+    Auxiliar function that returns the state of a search that has not begun
+    """
+
+    return {
+        "generation": 0,
+        "mean": list(mean),
+        "std": [0.25*abs(x) + 1e-3 for x in mean],
+        "best_weights": list(mean),
+        "best_score": None,
+        "seed": seed,
+        "history": [],
+    }
+
+
+def _save(state, name):
+    """
+    Auxiliar function that saves a state, replacing the file at once so that it is never half written
+    """
+
+    with open(name + ".tmp", "w") as writer:
+        json.dump(state, writer, indent=2)
+    os.replace(name + ".tmp", name)
+
+
+def tune(boards, generations = 10, population = 16, elite = 4, games = 8, n_blocks = 200, seed = 0,
+         initial = EXPERT_WEIGHTS, checkpoint = None, workers = None, serial = False, log = None):
+    """
+    Function that searches the best weights of the expert player and returns the final state of the search
+    The state is a dictionary, the best weights found are in "best_weights" and their score in the games
+    of the last generation in "best_score"
+    Arguments:
+        boards -> list of shapes of the boards
+        generations -> number of generations, 10 if not given
+        population -> candidates of each generation, 16 if not given
+        elite -> best candidates used to move the distribution, 4 if not given
+        games -> random games of each board played by each candidate, 8 if not given
+        n_blocks -> blocks of each game, 200 if not given
+        seed -> seed of the search and of the games, 0 if not given
+        initial -> weights where the search begins, EXPERT_WEIGHTS if not given
+        checkpoint -> name of a file where the state is saved after each generation; if it exists, the search is resumed from it
+        workers, serial -> as in run_batch
+        log -> function called with a line of text after each generation
+    """
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint) as reader:
+            state = json.load(reader)
+    else:
+        state = _new_state(initial, seed)
+
+    while state["generation"] < generations:
+        generation = state["generation"]
+
+        # the random numbers of each generation only depend on the seed, so a resumed search is the same
+        rng = random.Random(state["seed"]*1000003 + generation)
+        candidates = [list(state["mean"])]
+        while len(candidates) < population:
+            candidates.append([rng.gauss(m, s) for m, s in zip(state["mean"], state["std"])])
+
+        # the best weights are played with the candidates, the scores of other games can't be compared
+        games_seed = state["seed"] + generation*games
+        scores = evaluate(candidates + [state["best_weights"]], boards, games, n_blocks, games_seed, workers, serial)
+        incumbent = scores.pop()
+
+        ranking = sorted(range(len(candidates)), key=lambda k: -scores[k])
+        best = ranking[:elite]
+        for i in range(len(state["mean"])):
+            values = [candidates[k][i] for k in best]
+            mean = sum(values)/len(values)
+            variance = sum((v - mean)**2 for v in values)/len(values)
+            state["mean"][i] = mean
+            # the deviation never reaches 0, so the search does not stop moving
+            state["std"][i] = max(math.sqrt(variance), 1e-3*abs(mean) + 1e-6)
+
+        if scores[ranking[0]] > incumbent:
+            state["best_score"] = scores[ranking[0]]
+            state["best_weights"] = candidates[ranking[0]]
+        else:
+            state["best_score"] = incumbent
+
+        state["history"].append({"generation": generation, "best": scores[ranking[0]], "mean": sum(scores)/len(scores),
+                                 "incumbent": incumbent})
+        state["generation"] = generation + 1
+        if checkpoint is not None:
+            _save(state, checkpoint)
+        if log is not None:
+            log("generation {}: best {:.2f}, mean {:.2f}, best weights so far {:.2f} before and {:.2f} after".format(
+                generation, scores[ranking[0]], sum(scores)/len(scores), incumbent, state["best_score"]))
+
+    return state
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Tunes the weights of the expert player")
+    parser.add_argument("--boards", type=_board_shape, nargs="+", default=[Shape(10, 10)], help="shapes of the boards, as WIDTHxHEIGHT")
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--elite", type=int, default=4)
+    parser.add_argument("--games", type=int, default=8, help="random games of each board for each candidate")
+    parser.add_argument("--blocks", type=int, default=200, help="blocks of each game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", help="file to save the search after each generation and to resume it from")
+    parser.add_argument("--output", help="file where the best weights are written as JSON")
+    parser.add_argument("--workers", type=int, help="number of processes, the number of cores by default")
+    parser.add_argument("--serial", action="store_true", help="play the games in this process")
+    args = parser.parse_args(argv)
+
+    state = tune(args.boards, args.generations, args.population, args.elite, args.games, args.blocks, args.seed,
+                 checkpoint=args.checkpoint, workers=args.workers, serial=args.serial, log=print)
+
+    print("best weights:", state["best_weights"], "score:", state["best_score"])
+    if args.output:
+        with open(args.output, "w") as writer:
+            json.dump({"weights": state["best_weights"], "score": state["best_score"]}, writer, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())